@@ -1,15 +1,21 @@
+import time
+STARTED = time.perf_counter()  # reference point of the startup profile (services/startup.py)
+
 import os
 from flask import Flask
-from flask_cors import CORS
-from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
-from flask_jwt_extended import JWTManager
-from prometheus_flask_exporter import PrometheusMetrics
+from app.services import startup
+
+startup.record('import flask, prometheus_client', time.perf_counter() - STARTED)
+with startup.step('import extensions'):
+    from flask_cors import CORS
+    from prometheus_flask_exporter import PrometheusMetrics
+with startup.step('import models'):
+    from app.models import db
+    from app.services import auth_cache, db_engine, profiling
 
-# Initialize extensions
-db = SQLAlchemy()
-migrate = Migrate()
-jwt = JWTManager()
+# Initialize extensions (Flask-Migrate, which pulls in Alembic, is only
+# loaded for the `flask` command; see create_app)
+jwt = auth_cache.CachingJWTManager()
 metrics = PrometheusMetrics.for_app_factory()
 
 def create_app(config=None):
@@ -21,21 +27,37 @@ def create_app(config=None):
         app.config.update(config)
     
     # Initialize extensions with app
-    CORS(app)
-    db.init_app(app)
-    migrate.init_app(app, db)
-    jwt.init_app(app)
-    metrics.init_app(app)
-    
-    # Custom metrics
-    metrics.info('app_info', 'Application info', version='1.0.0')
+    with startup.step('cors'):
+        CORS(app)
+    with startup.step('sqlalchemy'):
+        db_engine.configure(app)
+        db.init_app(app)
+        db_engine.init_app(app, db)
+        profiling.init_app(app, db)
+    if startup.running_cli():
+        with startup.step('migrate'):
+            from flask_migrate import Migrate
+            Migrate(app, db, directory=startup.MIGRATIONS_DIR)
+    with startup.step('jwt'):
+        jwt.init_app(app)
+    with startup.step('metrics'):
+        metrics.init_app(app)
+        
+        # Custom metrics
+        metrics.info('app_info', 'Application info', version='1.0.0')
     
     # Register blueprints
-    from app.api import api_bp
-    app.register_blueprint(api_bp, url_prefix='/api')
+    with startup.step('blueprints'):
+        from app.api import api_bp
+        app.register_blueprint(api_bp, url_prefix='/api')
+        
+        from app.auth import auth_bp
+        app.register_blueprint(auth_bp, url_prefix='/auth')
     
-    from app.auth import auth_bp
-    app.register_blueprint(auth_bp, url_prefix='/auth')
+    # Schema checks (flask check-query-plans) and `flask preflight`
+    from app.services.query_plans import check_query_plans
+    app.cli.add_command(check_query_plans)
+    startup.init_app(app)
     
     @app.route('/')
     def index():
@@ -46,4 +68,5 @@ def create_app(config=None):
     def not_found(e):
         return app.send_static_file('index.html')
     
+    startup.report(app)
     return app
@@ -10,10 +10,31 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///app.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Connection pool, per gunicorn worker (see app/services/db_engine.py)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'True') == 'True'
+    DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 15000))
+    SQLITE_WAL = os.environ.get('SQLITE_WAL', 'True') == 'True'
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    
+    # Request profiling (see app/services/profiling.py)
+    SLOW_QUERY_MS = int(os.environ.get('SLOW_QUERY_MS', 250))
+    PROFILING_SERVER_TIMING = os.environ.get('PROFILING_SERVER_TIMING', 'header')  # 'header', 'always' or 'off'
+    PROFILING_ALLOCATIONS = os.environ.get('PROFILING_ALLOCATIONS', 'False') == 'True'
+    
+    # Startup (see app/services/startup.py)
+    STARTUP_PROFILE = os.environ.get('STARTUP_PROFILE', 'False') == 'True'
+    STARTUP_TARGET_SECONDS = float(os.environ.get('STARTUP_TARGET_SECONDS', 1.0))
+    
     # JWT
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'jwt_dev_key_change_in_production')
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
+    JWT_CACHE_SIZE = int(os.environ.get('JWT_CACHE_SIZE', 10000))  # verified tokens kept per worker
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', 60))  # seconds another worker may serve a stale profile
     
     # Google OAuth
     GOOGLE_CLIENT_ID = os.environ.get('GOOGLE_CLIENT_ID')
@@ -1,4 +1,16 @@
-from app.models.user import User
-from app.models.food import Food
-from app.models.meal import Meal, MealItem
-from app.models.glucose import GlucoseReading
+from app.models.models import (
+    db,
+    User,
+    Food,
+    Recipe,
+    RecipeIngredient,
+    Meal,
+    MealItem,
+    GlucoseReading,
+    DailyRollup,
+    GlucoseChunk,
+    MealResponse,
+    CatalogFood,
+    CatalogImport,
+    ResourceVersion
+)
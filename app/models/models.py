@@ -1,21 +1,54 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import DDL, event, inspect, text
+from sqlalchemy.orm import joinedload, selectinload
 from datetime import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
+from app.models import nutrients
+
+# The one schema for the application. Composite indexes follow the hot query
+# shapes in app/app.py and app/services: per-user lists filtered on a time range
+# and ordered by (timestamp, id), see `flask check-query-plans`.
 
 db = SQLAlchemy()
 
+# Name search (services/search.py) relies on pg_trgm when running on PostgreSQL
+event.listen(
+    db.metadata,
+    'before_create',
+    DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(dialect='postgresql')
+)
+
+def name_search_indexes(table):
+    # GIN indexes for word/prefix matching (tsvector) and typo tolerance (trigrams)
+    return (
+        db.Index(
+            f'ix_{table}_name_tsv',
+            text("to_tsvector('simple', name)"),
+            postgresql_using='gin'
+        ).ddl_if(dialect='postgresql'),
+        db.Index(
+            f'ix_{table}_name_trgm',
+            'name',
+            postgresql_using='gin',
+            postgresql_ops={'name': 'gin_trgm_ops'}
+        ).ddl_if(dialect='postgresql'),
+    )
+
 # User Model
 class User(db.Model):
     __tablename__ = 'users'
     
     id = db.Column(db.Integer, primary_key=True)
-    username = db.Column(db.String(80), unique=True, nullable=False)
+    username = db.Column(db.String(80), unique=True, nullable=True)
     email = db.Column(db.String(120), unique=True, nullable=False)
-    password_hash = db.Column(db.String(255), nullable=False)
+    password_hash = db.Column(db.String(255), nullable=True)  # None for Google sign-in accounts
+    google_id = db.Column(db.String(100), unique=True, nullable=True)
+    name = db.Column(db.String(120), nullable=True)
     first_name = db.Column(db.String(80), nullable=True)
     last_name = db.Column(db.String(80), nullable=True)
     date_of_birth = db.Column(db.Date, nullable=True)
     gender = db.Column(db.String(10), nullable=True)
+    age = db.Column(db.Integer, nullable=True)
     height = db.Column(db.Float, nullable=True)  # in cm
     weight = db.Column(db.Float, nullable=True)  # in kg
     goal_calories = db.Column(db.Integer, nullable=True)
@@ -30,22 +63,27 @@ class User(db.Model):
     meals = db.relationship('Meal', backref='user', lazy=True, cascade='all, delete-orphan')
     glucose_readings = db.relationship('GlucoseReading', backref='user', lazy=True, cascade='all, delete-orphan')
     recipes = db.relationship('Recipe', backref='user', lazy=True, cascade='all, delete-orphan')
+    foods = db.relationship('Food', backref='user', lazy=True, cascade='all, delete-orphan')
     
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
         
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        if self.password_hash:
+            return check_password_hash(self.password_hash, password)
+        return False
     
     def to_dict(self):
         return {
             'id': self.id,
             'username': self.username,
             'email': self.email,
+            'name': self.name,
             'first_name': self.first_name,
             'last_name': self.last_name,
             'date_of_birth': self.date_of_birth.isoformat() if self.date_of_birth else None,
             'gender': self.gender,
+            'age': self.age,
             'height': self.height,
             'weight': self.weight,
             'goal_calories': self.goal_calories,
@@ -57,16 +95,69 @@ class User(db.Model):
             'updated_at': self.updated_at.isoformat()
         }
 
-# Food/Recipe Model
+# Food Model (a user's own food, nutrients per serving)
+class Food(db.Model):
+    __tablename__ = 'foods'
+    __table_args__ = name_search_indexes('foods')
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(120), nullable=False)
+    description = db.Column(db.Text, nullable=True)
+    serving_size = db.Column(db.Float, nullable=False, default=100)  # in grams
+    serving_unit = db.Column(db.String(20), nullable=False, default='g')
+    calories = db.Column(db.Float, nullable=False, default=0)  # per serving
+    carbs = db.Column(db.Float, nullable=False, default=0)  # in grams
+    proteins = db.Column(db.Float, nullable=False, default=0)  # in grams
+    fats = db.Column(db.Float, nullable=False, default=0)  # in grams
+    version = db.Column(db.Integer, nullable=False, default=1)  # bumped when nutrients change
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Foreign keys
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    
+    # Relationships
+    meal_items = db.relationship('MealItem', backref='food', lazy=True)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'description': self.description,
+            'serving_size': self.serving_size,
+            'serving_unit': self.serving_unit,
+            'calories': self.calories,
+            'carbs': self.carbs,
+            'proteins': self.proteins,
+            'fats': self.fats,
+            'user_id': self.user_id,
+            'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat()
+        }
+
+@event.listens_for(Food, 'before_update')
+def bump_nutrient_version(mapper, connection, target):
+    # Counts revisions of the nutrient values (serving_size included)
+    state = inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in nutrients.NUTRIENTS + ('serving_size',)):
+        target.version = (target.version or 0) + 1
+
+# Recipe Model
 class Recipe(db.Model):
     __tablename__ = 'recipes'
+    __table_args__ = name_search_indexes('recipes')
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(120), nullable=False)
     description = db.Column(db.Text, nullable=True)
-    serving_size = db.Column(db.Float, nullable=False)  # in grams
+    ingredients = db.Column(db.Text, nullable=True)
+    instructions = db.Column(db.Text, nullable=True)
+    serving_size = db.Column(db.Float, nullable=False, default=100)  # in grams
     serving_unit = db.Column(db.String(20), nullable=False, default='g')
-    calories = db.Column(db.Integer, nullable=False)  # per serving
+    servings = db.Column(db.Float, nullable=False, default=1, server_default='1')  # servings the ingredient items make
+    # Per serving; derived from ingredient_items when the recipe has any
+    # (services/recipe_graph.py), hand-entered otherwise
+    calories = db.Column(db.Float, nullable=False)
     carbs = db.Column(db.Float, nullable=False)  # in grams
     proteins = db.Column(db.Float, nullable=False)  # in grams
     fats = db.Column(db.Float, nullable=False)  # in grams
@@ -75,18 +166,28 @@ class Recipe(db.Model):
     updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Foreign keys
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     
     # Relationships
     meal_items = db.relationship('MealItem', backref='recipe', lazy=True)
+    ingredient_items = db.relationship(
+        'RecipeIngredient',
+        foreign_keys='RecipeIngredient.recipe_id',
+        backref='recipe',
+        lazy=True,
+        cascade='all, delete-orphan'
+    )
     
     def to_dict(self):
         return {
             'id': self.id,
             'name': self.name,
             'description': self.description,
+            'ingredients': self.ingredients,
+            'instructions': self.instructions,
             'serving_size': self.serving_size,
             'serving_unit': self.serving_unit,
+            'servings': self.servings,
             'calories': self.calories,
             'carbs': self.carbs,
             'proteins': self.proteins,
@@ -97,14 +198,51 @@ class Recipe(db.Model):
             'updated_at': self.updated_at.isoformat()
         }
 
+# Recipe Ingredient (edge of the recipe graph: a food or a sub-recipe used by a recipe)
+class RecipeIngredient(db.Model):
+    __tablename__ = 'recipe_ingredients'
+    __table_args__ = (
+        db.CheckConstraint('(food_id IS NULL) <> (sub_recipe_id IS NULL)', name='ck_recipe_ingredients_one_source'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    quantity = db.Column(db.Float, nullable=False, default=1.0)  # number of servings, for sub-recipes
+    amount = db.Column(db.Float, nullable=True)  # in grams, for foods
+    
+    # Foreign keys (exactly one of food_id / sub_recipe_id is set). The source
+    # columns are indexed for the dependents walk when a food or recipe changes.
+    recipe_id = db.Column(db.Integer, db.ForeignKey('recipes.id'), nullable=False, index=True)
+    food_id = db.Column(db.Integer, db.ForeignKey('foods.id'), nullable=True, index=True)
+    sub_recipe_id = db.Column(db.Integer, db.ForeignKey('recipes.id'), nullable=True, index=True)
+    
+    def to_dict(self):
+        # Same shape as the items clients send: {food_id, amount} or {recipe_id, quantity}
+        return {
+            'id': self.id,
+            'food_id': self.food_id,
+            'recipe_id': self.sub_recipe_id,
+            'quantity': self.quantity,
+            'amount': self.amount
+        }
+
 # Meal Model
 class Meal(db.Model):
     __tablename__ = 'meals'
+    __table_args__ = (
+        # Lists and analytics: WHERE user_id = ? AND timestamp BETWEEN .. ORDER BY timestamp, id
+        db.Index('ix_meals_user_id_timestamp', 'user_id', 'timestamp', 'id'),
+    ) + name_search_indexes('meals')
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(120), nullable=False)
     timestamp = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     notes = db.Column(db.Text, nullable=True)
+    # Stored totals of the items, kept current by refresh_totals() and
+    # services/meal_totals.py (see `flask check-meal-totals`)
+    calories = db.Column(db.Float, nullable=False, default=0, server_default='0')
+    carbs = db.Column(db.Float, nullable=False, default=0, server_default='0')  # in grams
+    proteins = db.Column(db.Float, nullable=False, default=0, server_default='0')  # in grams
+    fats = db.Column(db.Float, nullable=False, default=0, server_default='0')  # in grams
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -114,28 +252,50 @@ class Meal(db.Model):
     # Relationships
     meal_items = db.relationship('MealItem', backref='meal', lazy=True, cascade='all, delete-orphan')
     
+    @classmethod
+    def eager_items(cls):
+        # Loader option for list endpoints: one query for the items of all
+        # meals (with their recipes and foods joined in) instead of two per meal
+        return selectinload(cls.meal_items).options(joinedload(MealItem.recipe), joinedload(MealItem.food))
+    
+    def compute_totals(self):
+        totals = {'calories': 0, 'carbs': 0, 'proteins': 0, 'fats': 0}
+        for item in self.meal_items:
+            for name, value in item.totals().items():
+                totals[name] += value
+        return totals
+    
+    def refresh_totals(self):
+        # Call whenever meal_items change, before reporting the meal to the rollups
+        for name, value in self.compute_totals().items():
+            setattr(self, name, value)
+    
+    def totals(self):
+        return {name: getattr(self, name) or 0 for name in nutrients.NUTRIENTS}
+    
     def total_calories(self):
-        return sum(item.calories_total() for item in self.meal_items)
+        return self.totals()['calories']
     
     def total_carbs(self):
-        return sum(item.carbs_total() for item in self.meal_items)
+        return self.totals()['carbs']
     
     def total_proteins(self):
-        return sum(item.proteins_total() for item in self.meal_items)
+        return self.totals()['proteins']
     
     def total_fats(self):
-        return sum(item.fats_total() for item in self.meal_items)
+        return self.totals()['fats']
     
     def to_dict(self):
+        totals = self.totals()
         return {
             'id': self.id,
             'name': self.name,
             'timestamp': self.timestamp.isoformat(),
             'notes': self.notes,
-            'total_calories': self.total_calories(),
-            'total_carbs': self.total_carbs(),
-            'total_proteins': self.total_proteins(),
-            'total_fats': self.total_fats(),
+            'total_calories': totals['calories'],
+            'total_carbs': totals['carbs'],
+            'total_proteins': totals['proteins'],
+            'total_fats': totals['fats'],
             'meal_items': [item.to_dict() for item in self.meal_items],
             'user_id': self.user_id,
             'created_at': self.created_at.isoformat(),
@@ -145,37 +305,60 @@ class Meal(db.Model):
 # Meal Item (junction between Meal and Food/Recipe)
 class MealItem(db.Model):
     __tablename__ = 'meal_items'
+    __table_args__ = (
+        db.CheckConstraint('(recipe_id IS NULL) <> (food_id IS NULL)', name='ck_meal_items_one_source'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
-    quantity = db.Column(db.Float, nullable=False, default=1.0)  # number of servings
+    quantity = db.Column(db.Float, nullable=False, default=1.0)  # number of servings, for recipes
+    amount = db.Column(db.Float, nullable=True)  # in grams, for foods
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    # Foreign keys
-    meal_id = db.Column(db.Integer, db.ForeignKey('meals.id'), nullable=False)
-    recipe_id = db.Column(db.Integer, db.ForeignKey('recipes.id'), nullable=False)
+    # Foreign keys (exactly one of recipe_id / food_id is set)
+    meal_id = db.Column(db.Integer, db.ForeignKey('meals.id'), nullable=False, index=True)
+    recipe_id = db.Column(db.Integer, db.ForeignKey('recipes.id'), nullable=True, index=True)
+    food_id = db.Column(db.Integer, db.ForeignKey('foods.id'), nullable=True, index=True)
     
     def calories_total(self):
-        return self.recipe.calories * self.quantity
+        return self.totals()['calories']
     
     def carbs_total(self):
-        return self.recipe.carbs * self.quantity
+        return self.totals()['carbs']
     
     def proteins_total(self):
-        return self.recipe.proteins * self.quantity
+        return self.totals()['proteins']
     
     def fats_total(self):
-        return self.recipe.fats * self.quantity
+        return self.totals()['fats']
+    
+    def totals(self):
+        recipe = self.recipe
+        if recipe is not None:
+            return {
+                'calories': recipe.calories * self.quantity,
+                'carbs': recipe.carbs * self.quantity,
+                'proteins': recipe.proteins * self.quantity,
+                'fats': recipe.fats * self.quantity
+            }
+        if self.food is not None:
+            return nutrients.per_gram(self.food).scaled(self.amount or 0)
+        return nutrients.zero()
     
     def to_dict(self):
+        recipe = self.recipe
+        food = self.food
+        totals = self.totals()
         return {
             'id': self.id,
             'quantity': self.quantity,
-            'recipe': self.recipe.to_dict() if self.recipe else None,
-            'calories_total': self.calories_total(),
-            'carbs_total': self.carbs_total(),
-            'proteins_total': self.proteins_total(),
-            'fats_total': self.fats_total(),
+            'amount': self.amount,
+            'recipe': recipe.to_dict() if recipe else None,
+            'food': food.to_dict() if food else None,
+            'calories_total': totals['calories'],
+            'carbs_total': totals['carbs'],
+            'proteins_total': totals['proteins'],
+            'fats_total': totals['fats'],
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat()
         }
@@ -183,6 +366,21 @@ class MealItem(db.Model):
 # Glucose Reading Model
 class GlucoseReading(db.Model):
     __tablename__ = 'glucose_readings'
+    __table_args__ = (
+        # Lists, ingest de-duplication, chunk refreshes and the meal linker all
+        # range-scan one user's readings by time; value and meal_id are included
+        # so those reads are index-only on PostgreSQL
+        db.Index(
+            'ix_glucose_readings_user_id_timestamp',
+            'user_id',
+            'timestamp',
+            'id',
+            postgresql_include=['value', 'meal_id']
+        ),
+        # One reading per user and instant; concurrent uploads of the same
+        # readings are resolved by the database (services/glucose_ingest.py)
+        db.UniqueConstraint('user_id', 'timestamp', name='uq_glucose_readings_user_timestamp'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     value = db.Column(db.Float, nullable=False)  # in mg/dL
@@ -193,7 +391,7 @@ class GlucoseReading(db.Model):
     
     # Foreign keys
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    meal_id = db.Column(db.Integer, db.ForeignKey('meals.id'), nullable=True)  # Optional relation to a meal
+    meal_id = db.Column(db.Integer, db.ForeignKey('meals.id'), nullable=True, index=True)  # Set by the meal response linker
     
     def to_dict(self):
         return {
@@ -206,3 +404,103 @@ class GlucoseReading(db.Model):
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat()
         }
+
+# Daily Rollup Model (per-user, per-day aggregates kept up to date on write)
+class DailyRollup(db.Model):
+    __tablename__ = 'daily_rollups'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    calories = db.Column(db.Float, nullable=False, default=0)
+    carbs = db.Column(db.Float, nullable=False, default=0)  # in grams
+    proteins = db.Column(db.Float, nullable=False, default=0)  # in grams
+    fats = db.Column(db.Float, nullable=False, default=0)  # in grams
+    meals_count = db.Column(db.Integer, nullable=False, default=0)
+    glucose_count = db.Column(db.Integer, nullable=False, default=0)
+    glucose_sum = db.Column(db.Float, nullable=False, default=0)  # in mg/dL
+    glucose_min = db.Column(db.Float, nullable=True)
+    glucose_max = db.Column(db.Float, nullable=True)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+# Glucose Chunk Model (one user-day of readings packed into arrays, for chart reads)
+class GlucoseChunk(db.Model):
+    __tablename__ = 'glucose_chunks'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    offsets = db.Column(db.LargeBinary, nullable=False)  # uint32 seconds since midnight, ascending
+    values = db.Column(db.LargeBinary, nullable=False)  # float32 mg/dL, aligned with offsets
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+# Meal Response Model (glycemic response to a meal, precomputed by the linker)
+class MealResponse(db.Model):
+    __tablename__ = 'meal_responses'
+    
+    meal_id = db.Column(db.Integer, db.ForeignKey('meals.id'), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    readings_count = db.Column(db.Integer, nullable=False, default=0)
+    baseline = db.Column(db.Float, nullable=True)  # in mg/dL
+    peak = db.Column(db.Float, nullable=True)  # in mg/dL
+    time_to_peak = db.Column(db.Integer, nullable=True)  # in minutes after the meal
+    return_to_baseline = db.Column(db.Integer, nullable=True)  # in minutes, None if not within the window
+    computed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'meal_id': self.meal_id,
+            'readings_count': self.readings_count,
+            'baseline': self.baseline,
+            'peak': self.peak,
+            'rise': self.peak - self.baseline if self.peak is not None and self.baseline is not None else None,
+            'time_to_peak': self.time_to_peak,
+            'return_to_baseline': self.return_to_baseline,
+            'computed_at': self.computed_at.isoformat()
+        }
+
+# Catalog Food Model (shared reference foods imported from open datasets, per 100 g)
+class CatalogFood(db.Model):
+    __tablename__ = 'food_catalog'
+    __table_args__ = (
+        db.UniqueConstraint('source', 'source_id', name='uq_food_catalog_source'),
+    ) + name_search_indexes('food_catalog')
+    
+    id = db.Column(db.Integer, primary_key=True)
+    source = db.Column(db.String(40), nullable=False)  # dataset name, e.g. 'off' or 'usda'
+    source_id = db.Column(db.String(64), nullable=False)  # id within the dataset
+    name = db.Column(db.String(255), nullable=False)
+    brand = db.Column(db.String(120), nullable=True)
+    calories = db.Column(db.Float, nullable=False, default=0)
+    carbs = db.Column(db.Float, nullable=False, default=0)  # in grams
+    proteins = db.Column(db.Float, nullable=False, default=0)  # in grams
+    fats = db.Column(db.Float, nullable=False, default=0)  # in grams
+    serving_size = db.Column(db.Float, nullable=False, default=100)  # in grams
+    serving_unit = db.Column(db.String(20), nullable=False, default='g')
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+# Catalog Import Model (progress of a bulk import, for resuming)
+class CatalogImport(db.Model):
+    __tablename__ = 'catalog_imports'
+    __table_args__ = (
+        db.UniqueConstraint('source', 'filename', name='uq_catalog_imports_file'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    source = db.Column(db.String(40), nullable=False)
+    filename = db.Column(db.String(255), nullable=False)
+    rows_read = db.Column(db.Integer, nullable=False, default=0)  # rows consumed from the file, committed
+    rows_inserted = db.Column(db.Integer, nullable=False, default=0)
+    rows_skipped = db.Column(db.Integer, nullable=False, default=0)
+    status = db.Column(db.String(20), nullable=False, default='running')  # running, done
+    started_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+# Resource Version Model (per-user change counters behind the ETag headers)
+class ResourceVersion(db.Model):
+    __tablename__ = 'resource_versions'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    resource = db.Column(db.String(20), primary_key=True)  # foods, recipes, meals, glucose
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
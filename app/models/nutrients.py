@@ -0,0 +1,45 @@
+from array import array
+from app.services.cache import LRUCache
+
+# Per-gram nutrient vectors for foods. A food's vector is computed once and
+# shared by every meal item that uses it. The cache key holds the values the
+# vector is computed from, not just (food id, version): ids are reused after a
+# delete (SQLite), versions restart at 1, and a vector may be computed inside a
+# transaction that is rolled back, so only the values themselves identify it.
+# Stale vectors are never looked up again and age out of the cache.
+
+NUTRIENTS = ('calories', 'carbs', 'proteins', 'fats')
+CACHE_SIZE = 20000
+
+_vectors = LRUCache(CACHE_SIZE)
+
+
+class NutrientVector:
+    __slots__ = ('food_id', 'version', 'values')
+
+    def __init__(self, food_id, version, values):
+        self.food_id = food_id
+        self.version = version
+        self.values = values  # array('d') aligned with NUTRIENTS
+
+    @classmethod
+    def from_food(cls, food):
+        serving_size = food.serving_size or 1
+        return cls(food.id, food.version, array('d', (getattr(food, name) / serving_size for name in NUTRIENTS)))
+
+    def scaled(self, amount):
+        return dict(zip(NUTRIENTS, (value * amount for value in self.values)))
+
+
+def per_gram(food):
+    key = (food.id, food.serving_size) + tuple(getattr(food, name) for name in NUTRIENTS)
+    vector = _vectors.get(key)
+    if vector is None:
+        vector = NutrientVector.from_food(food)
+        if food.id is not None:
+            _vectors.set(key, vector)
+    return vector
+
+
+def zero():
+    return dict.fromkeys(NUTRIENTS, 0)
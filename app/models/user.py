@@ -1,38 +0,0 @@
-from app import db
-from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
-
-class User(db.Model):
-    __tablename__ = 'users'
-    
-    id = db.Column(db.Integer, primary_key=True)
-    email = db.Column(db.String(120), unique=True, nullable=False)
-    password_hash = db.Column(db.String(256), nullable=True)
-    name = db.Column(db.String(120), nullable=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    google_id = db.Column(db.String(100), unique=True, nullable=True)
-    profile_image = db.Column(db.String(255), nullable=True)
-    
-    # Relationships
-    meals = db.relationship('Meal', backref='user', lazy=True, cascade='all, delete-orphan')
-    glucose_readings = db.relationship('GlucoseReading', backref='user', lazy=True, cascade='all, delete-orphan')
-    
-    def __repr__(self):
-        return f'<User {self.email}>'
-    
-    def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
-    
-    def check_password(self, password):
-        if self.password_hash:
-            return check_password_hash(self.password_hash, password)
-        return False
-    
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'email': self.email,
-            'name': self.name,
-            'created_at': self.created_at.isoformat(),
-            'profile_image': self.profile_image
-        }
@@ -0,0 +1,176 @@
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import Date, cast, func, literal_column, select
+from app.models import db, DailyRollup, GlucoseReading, Meal
+
+# Aggregates are computed with GROUP BY in the database and returned as plain
+# row mappings; no model instances are built for these reads.
+
+BUCKETS = ('day', 'week', 'month')
+
+
+def _dialect():
+    return db.session.get_bind().dialect.name
+
+
+def bucket_expr(column, bucket):
+    """SQL expression truncating a date/datetime column to the start of its bucket.
+
+    Weeks start on Monday on both backends.
+    """
+    if bucket not in BUCKETS:
+        raise ValueError(f"Unknown bucket '{bucket}'")
+    # Literal (not bound) arguments so the SELECT and GROUP BY expressions
+    # compile identically, which PostgreSQL requires
+    if _dialect() == 'postgresql':
+        return cast(func.date_trunc(literal_column(f"'{bucket}'"), column), Date)
+    if bucket == 'day':
+        return func.date(column)
+    if bucket == 'week':
+        return func.date(column, literal_column("'weekday 0'"), literal_column("'-6 days'"))
+    return func.date(column, literal_column("'start of month'"))
+
+
+def bucket_start(day, bucket):
+    if bucket == 'week':
+        return day - timedelta(days=day.weekday())
+    if bucket == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def bucket_keys(start_day, end_day, bucket):
+    """Start date of every bucket overlapping [start_day, end_day]."""
+    keys = []
+    current = bucket_start(start_day, bucket)
+    while current <= end_day:
+        keys.append(current)
+        if bucket == 'day':
+            current += timedelta(days=1)
+        elif bucket == 'week':
+            current += timedelta(days=7)
+        else:
+            current = (current.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return keys
+
+
+def as_date(value):
+    # SQLite hands back date() results as ISO strings
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+def _time_window(column, start_day, end_day):
+    conditions = []
+    if start_day:
+        conditions.append(column >= datetime.combine(start_day, time.min))
+    if end_day:
+        conditions.append(column < datetime.combine(end_day + timedelta(days=1), time.min))
+    return conditions
+
+
+# Aggregates over the daily rollups (what the analytics routes read)
+def _rollup_columns():
+    glucose_count = func.sum(DailyRollup.glucose_count)
+    return [
+        func.sum(DailyRollup.calories).label('calories'),
+        func.sum(DailyRollup.carbs).label('carbs'),
+        func.sum(DailyRollup.proteins).label('proteins'),
+        func.sum(DailyRollup.fats).label('fats'),
+        func.sum(DailyRollup.meals_count).label('meals_count'),
+        glucose_count.label('glucose_count'),
+        (func.sum(DailyRollup.glucose_sum) / func.nullif(glucose_count, 0)).label('glucose_average'),
+        func.min(DailyRollup.glucose_min).label('glucose_min'),
+        func.max(DailyRollup.glucose_max).label('glucose_max')
+    ]
+
+
+def _rollup_range(stmt, user_id, start_day, end_day):
+    return stmt.where(
+        DailyRollup.user_id == user_id,
+        DailyRollup.day >= start_day,
+        DailyRollup.day <= end_day
+    )
+
+
+def _nutrition(row):
+    return {
+        "calories": (row and row['calories']) or 0,
+        "carbs": (row and row['carbs']) or 0,
+        "protein": (row and row['proteins']) or 0,
+        "fat": (row and row['fats']) or 0
+    }
+
+
+def summarize(user_id, start_day, end_day):
+    """Totals for [start_day, end_day] as a single aggregate row."""
+    stmt = _rollup_range(select(*_rollup_columns()), user_id, start_day, end_day)
+    row = db.session.execute(stmt).mappings().one()
+
+    return {
+        "nutrition": _nutrition(row),
+        "glucose": {
+            "average": row['glucose_average'] or 0,
+            "min": row['glucose_min'] or 0,
+            "max": row['glucose_max'] or 0,
+            "readings_count": row['glucose_count'] or 0
+        },
+        "meals_count": row['meals_count'] or 0
+    }
+
+
+def series(user_id, start_day, end_day, bucket='day'):
+    """Per-bucket totals for [start_day, end_day], zero-filled for empty buckets."""
+    period = bucket_expr(DailyRollup.day, bucket).label('period')
+    stmt = _rollup_range(select(period, *_rollup_columns()), user_id, start_day, end_day)
+    stmt = stmt.group_by(period).order_by(period)
+    rows = {as_date(row['period']): row for row in db.session.execute(stmt).mappings()}
+
+    buckets = []
+    for key in bucket_keys(start_day, end_day, bucket):
+        row = rows.get(key)
+        buckets.append({
+            "period": key.isoformat(),
+            "nutrition": _nutrition(row),
+            "glucose": {
+                "average": (row and row['glucose_average']) or 0,
+                "min": (row and row['glucose_min']) or 0,
+                "max": (row and row['glucose_max']) or 0,
+                "count": (row and row['glucose_count']) or 0
+            },
+            "meals_count": (row and row['meals_count']) or 0
+        })
+    return buckets
+
+
+# Aggregates over the source tables (used to build and repair the rollups)
+def meal_series(user_id, start_day=None, end_day=None, bucket='day'):
+    # Per-meal totals are stored on the meal rows, see services/meal_totals.py
+    period = bucket_expr(Meal.timestamp, bucket).label('period')
+    stmt = select(
+        period,
+        func.count(Meal.id).label('meals_count'),
+        *(func.coalesce(func.sum(getattr(Meal, name)), 0).label(name) for name in ('calories', 'carbs', 'proteins', 'fats'))
+    ).where(
+        Meal.user_id == user_id,
+        *_time_window(Meal.timestamp, start_day, end_day)
+    ).group_by(period).order_by(period)
+    return db.session.execute(stmt).mappings().all()
+
+
+def glucose_series(user_id, start_day=None, end_day=None, bucket='day'):
+    period = bucket_expr(GlucoseReading.timestamp, bucket).label('period')
+    stmt = select(
+        period,
+        func.count(GlucoseReading.id).label('glucose_count'),
+        func.sum(GlucoseReading.value).label('glucose_sum'),
+        func.avg(GlucoseReading.value).label('glucose_average'),
+        func.min(GlucoseReading.value).label('glucose_min'),
+        func.max(GlucoseReading.value).label('glucose_max')
+    ).where(
+        GlucoseReading.user_id == user_id,
+        *_time_window(GlucoseReading.timestamp, start_day, end_day)
+    ).group_by(period).order_by(period)
+    return db.session.execute(stmt).mappings().all()
@@ -0,0 +1,95 @@
+import hashlib
+import time
+from flask import current_app
+from flask_jwt_extended import JWTManager
+from flask_jwt_extended.config import config as jwt_config
+from prometheus_client import Counter
+from app.models import db, User
+from app.services.cache import LRUCache
+
+# Per-process caches for the authenticated hot path.
+#
+# Verified tokens: @jwt_required() decodes the token and checks its signature
+# on every request. A token never changes, so once one verifies its claims are
+# kept (keyed by the token's SHA-256, per app) until the token's own exp, and
+# later requests carrying it skip the decode. Expired, CSRF-checked and
+# allow_expired decodes always take the full path.
+#
+# User profiles: GET /api/user is served from User.to_dict() cached by user
+# id. update_user writes the committed profile through; other workers pick
+# the change up when their entry is older than USER_CACHE_TTL seconds.
+
+TOKEN_CACHE_SIZE = 10000
+USER_CACHE_SIZE = 10000
+DEFAULT_USER_TTL = 60
+
+CACHE_LOOKUPS = Counter('auth_cache_lookups_total', 'Verified-token and user-profile cache lookups', ['cache', 'result'])
+
+profiles = LRUCache(USER_CACHE_SIZE)
+
+
+def _counted(cache, hit):
+    CACHE_LOOKUPS.labels(cache, 'hit' if hit else 'miss').inc()
+    return hit
+
+
+class CachingJWTManager(JWTManager):
+    """JWTManager that skips signature checks for tokens it has already verified."""
+
+    def __init__(self, app=None, add_context_processor=False):
+        super().__init__(app, add_context_processor)
+        # PyJWT >= 2.10 rejects tokens whose "sub" is not a string, so user
+        # ids go into tokens as strings (get_jwt_identity() returns '42')
+        self.user_identity_loader(str)
+
+    def init_app(self, app, add_context_processor=False):
+        super().init_app(app, add_context_processor)
+        app.extensions['verified_tokens'] = LRUCache(app.config.get('JWT_CACHE_SIZE', TOKEN_CACHE_SIZE))
+
+    def _decode_jwt_from_config(self, encoded_token, csrf_value=None, allow_expired=False):
+        if allow_expired or csrf_value is not None:
+            return super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+
+        verified = current_app.extensions['verified_tokens']
+        key = hashlib.sha256(encoded_token.encode()).digest()
+        entry = verified.get(key)
+        if entry is not None:
+            expires, claims = entry
+            if time.time() < expires:
+                _counted('token', True)
+                return dict(claims)
+            verified.delete(key)
+
+        _counted('token', False)
+        claims = super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+        if 'exp' in claims:
+            # Same cut-off PyJWT applies: expired once exp + leeway has passed
+            verified.set(key, (claims['exp'] + jwt_config.leeway, dict(claims)))
+        return claims
+
+
+def _user_ttl():
+    return current_app.config.get('USER_CACHE_TTL', DEFAULT_USER_TTL)
+
+
+def user_profile(user_id):
+    """User.to_dict() for the user, or None; served from the cache while fresh."""
+    user_id = int(user_id)
+    entry = profiles.get(user_id)
+    if entry is not None and time.monotonic() < entry[0]:
+        _counted('user', True)
+        return entry[1]
+
+    _counted('user', False)
+    user = db.session.get(User, user_id)
+    if user is None:
+        profiles.delete(user_id)
+        return None
+    return profile_changed(user)
+
+
+def profile_changed(user):
+    """Write-through after a committed change to the user; returns the profile."""
+    profile = user.to_dict()
+    profiles.set(user.id, (time.monotonic() + _user_ttl(), profile))
+    return profile
@@ -0,0 +1,140 @@
+import threading
+from bisect import bisect_left, insort
+from sqlalchemy import select
+from app.models import db, Food, Recipe
+from app.services import http_cache
+
+# Typeahead over food and recipe names. Each user gets a sorted array of name
+# suffixes starting at every word ("chicken breast", "breast"), so any word
+# prefix is a bisect plus a short forward scan. Built on first use per worker
+# process and patched in place by the food/recipe write routes.
+#
+# Each index remembers the user's foods/recipes ResourceVersion it reflects.
+# A lookup compares that with the current versions (one primary-key read) and
+# rebuilds when another worker has written since; a patch only advances the
+# index over the version bumps of its own request.
+
+DEFAULT_LIMIT = 8
+MAX_LIMIT = 20
+SCAN_FACTOR = 4  # entries scanned per result, leaves room for ranking and duplicates
+
+KINDS = {
+    'foods': ('food', Food),
+    'recipes': ('recipe', Recipe)
+}
+
+
+class PrefixIndex:
+    def __init__(self, versions=None):
+        self.versions = versions or {}  # kind -> ResourceVersion.version the entries reflect
+        self.entries = []  # sorted (suffix, word_position, key)
+        self.items = {}  # key -> {"id", "name", "kcal", "type"}
+
+    @staticmethod
+    def _suffixes(name):
+        words = name.lower().split()
+        return [(' '.join(words[i:]), i) for i in range(len(words))]
+
+    def add(self, key, item):
+        self.remove(key)
+        self.items[key] = item
+        for suffix, position in self._suffixes(item["name"]):
+            insort(self.entries, (suffix, position, key))
+
+    def remove(self, key):
+        item = self.items.pop(key, None)
+        if item is None:
+            return
+        for suffix, position in self._suffixes(item["name"]):
+            index = bisect_left(self.entries, (suffix, position, key))
+            if index < len(self.entries) and self.entries[index] == (suffix, position, key):
+                del self.entries[index]
+
+    def complete(self, prefix, limit):
+        """Names with a word starting with `prefix`; whole-name prefixes first, then shorter names."""
+        prefix = ' '.join(prefix.lower().split())
+        if not prefix:
+            return []
+
+        found = {}
+        index = bisect_left(self.entries, (prefix,))
+        end = min(index + limit * SCAN_FACTOR, len(self.entries))
+        while index < end and self.entries[index][0].startswith(prefix):
+            _, position, key = self.entries[index]
+            if key not in found or position < found[key]:
+                found[key] = position
+            index += 1
+
+        ranked = sorted(found, key=lambda key: (found[key] > 0, len(self.items[key]["name"]), self.items[key]["name"]))
+        return [self.items[key] for key in ranked[:limit]]
+
+
+_indexes = {}
+_lock = threading.Lock()
+
+
+def _current_versions(user_id):
+    current = http_cache.current_versions(user_id, list(KINDS))
+    return {kind: current.get(kind, (0, None))[0] for kind in KINDS}
+
+
+def _build(user_id, versions):
+    index = PrefixIndex(versions)
+    for kind, (label, model) in KINDS.items():
+        rows = db.session.execute(
+            select(model.id, model.name, model.calories).where(model.user_id == user_id)
+        )
+        for row_id, name, calories in rows:
+            index.add((kind, row_id), {"id": row_id, "name": name, "kcal": calories, "type": label})
+    return index
+
+
+def complete(user_id, prefix, limit=DEFAULT_LIMIT):
+    # Read before building: a write committed in between leaves the index
+    # newer than its versions, which costs one extra rebuild, never staleness
+    versions = _current_versions(user_id)
+    with _lock:
+        # Building under the lock means a concurrent write waits and then
+        # patches the fresh index instead of being lost
+        index = _indexes.get(user_id)
+        if index is None or index.versions != versions:
+            index = _indexes[user_id] = _build(user_id, versions)
+        return index.complete(prefix, limit)
+
+
+def _patchable(user_id, index):
+    """Advance the index's versions over this request's bumps; False if it missed another write."""
+    versions = dict(index.versions)
+    for kind in KINDS:
+        bumped = http_cache.bumped_version(user_id, kind)
+        if bumped is None:
+            continue
+        # Equal when an earlier patch of this request already advanced it
+        if bumped not in (versions.get(kind), versions.get(kind, 0) + 1):
+            return False
+        versions[kind] = bumped
+    index.versions = versions
+    return True
+
+
+def entry_changed(kind, user_id, row_id, name, calories):
+    """Patch an already-built index after a committed food/recipe create or update."""
+    with _lock:
+        index = _indexes.get(user_id)
+        if index is None:
+            return
+        if _patchable(user_id, index):
+            index.add((kind, row_id), {"id": row_id, "name": name, "kcal": calories, "type": KINDS[kind][0]})
+        else:
+            del _indexes[user_id]
+
+
+def entry_removed(kind, user_id, row_id):
+    with _lock:
+        index = _indexes.get(user_id)
+        if index is None:
+            return
+        if _patchable(user_id, index):
+            index.remove((kind, row_id))
+        else:
+            del _indexes[user_id]
@@ -0,0 +1,210 @@
+import csv
+import json
+import os
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from app.models import db, CatalogFood, CatalogImport
+from app.services.cache import LRUCache
+
+# Shared reference catalog of foods, loaded from open nutrition datasets by a
+# streaming importer and read through a per-process LRU cache (catalog rows
+# are effectively immutable once imported).
+
+DEFAULT_BATCH_SIZE = 1000
+CACHE_SIZE = 10000
+
+# Dataset column names accepted for each catalog field, first match wins.
+# Covers our own export format, Open Food Facts and USDA FoodData Central CSVs.
+FIELD_ALIASES = {
+    'source_id': ('source_id', 'id', 'code', 'fdc_id'),
+    'name': ('name', 'product_name', 'description'),
+    'brand': ('brand', 'brands', 'brand_owner'),
+    'calories': ('calories', 'energy-kcal_100g', 'energy_kcal', 'kcal'),
+    'carbs': ('carbs', 'carbohydrates', 'carbohydrates_100g'),
+    'proteins': ('proteins', 'protein', 'proteins_100g'),
+    'fats': ('fats', 'fat', 'fat_100g'),
+    'serving_size': ('serving_size',),
+    'serving_unit': ('serving_unit',)
+}
+
+COLUMNS = (
+    CatalogFood.id, CatalogFood.source, CatalogFood.name, CatalogFood.brand, CatalogFood.calories,
+    CatalogFood.carbs, CatalogFood.proteins, CatalogFood.fats, CatalogFood.serving_size, CatalogFood.serving_unit
+)
+
+cache = LRUCache(CACHE_SIZE)
+
+
+# Reading
+def _load(ids):
+    rows = db.session.execute(select(*COLUMNS).where(CatalogFood.id.in_(ids))).mappings()
+    return {row['id']: dict(row) for row in rows}
+
+
+def get_food(food_id):
+    """Catalog food as a dict, or None; served from the cache when possible."""
+    food = cache.get(food_id)
+    if food is None:
+        food = _load([food_id]).get(food_id)
+        if food is not None:
+            cache.set(food_id, food)
+    return food
+
+
+def get_foods(ids):
+    """Several catalog foods in the given order; misses are loaded with one IN query."""
+    found = {food_id: cache.get(food_id) for food_id in ids}
+    missing = [food_id for food_id, food in found.items() if food is None]
+    if missing:
+        for food_id, food in _load(missing).items():
+            cache.set(food_id, food)
+            found[food_id] = food
+    return [found[food_id] for food_id in ids if found[food_id] is not None]
+
+
+# Importing
+def iter_json_array(stream, chunk_size=1 << 16):
+    """Yield the objects of a top-level JSON array without loading the whole file."""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    started = False
+    while True:
+        chunk = stream.read(chunk_size)
+        buffer += chunk
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                position += 1
+            if not started:
+                if position < len(buffer) and buffer[position] == '[':
+                    started = True
+                    position += 1
+                    continue
+                if position < len(buffer):
+                    raise ValueError("Expected a JSON array")
+                break
+            if position < len(buffer) and buffer[position] == ']':
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                break  # object continues in the next chunk
+            yield item
+            position = end
+        buffer = buffer[position:]
+        if not chunk:
+            if buffer.strip():
+                raise ValueError("Truncated JSON array")
+            return
+
+
+def iter_records(path):
+    """Stream raw records from a .csv, .ndjson/.jsonl or .json (array) file."""
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, encoding='utf-8-sig', newline='') as stream:
+        if extension == '.csv':
+            yield from csv.DictReader(stream)
+        elif extension in ('.ndjson', '.jsonl'):
+            for line in stream:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from iter_json_array(stream)
+
+
+def _number(value):
+    if value in (None, ''):
+        return 0.0
+    return float(value)
+
+
+def normalize(record, source):
+    """Map a raw dataset record onto catalog columns; None if it is unusable."""
+    values = {}
+    for field, aliases in FIELD_ALIASES.items():
+        values[field] = next((record[alias] for alias in aliases if record.get(alias) not in (None, '')), None)
+
+    if not values['source_id'] or not values['name']:
+        return None
+    try:
+        return {
+            'source': source,
+            'source_id': str(values['source_id'])[:64],
+            'name': str(values['name']).strip()[:255],
+            'brand': str(values['brand']).strip()[:120] if values['brand'] else None,
+            'calories': _number(values['calories']),
+            'carbs': _number(values['carbs']),
+            'proteins': _number(values['proteins']),
+            'fats': _number(values['fats']),
+            'serving_size': _number(values['serving_size']) or 100,
+            'serving_unit': values['serving_unit'] or 'g'
+        }
+    except (TypeError, ValueError):
+        return None
+
+
+def _insert_ignoring_duplicates(rows):
+    # Re-running a batch after a crash must not fail on rows it already wrote
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        stmt = postgresql.insert(CatalogFood).on_conflict_do_nothing(index_elements=['source', 'source_id'])
+    elif dialect == 'sqlite':
+        stmt = sqlite.insert(CatalogFood).on_conflict_do_nothing(index_elements=['source', 'source_id'])
+    else:
+        raise RuntimeError(f"Catalog import is not supported on {dialect}")
+    # Rows that hit the conflict return nothing, so this counts the new ones
+    return len(db.session.execute(stmt.returning(CatalogFood.id), rows).all())
+
+
+def import_file(path, source, batch_size=DEFAULT_BATCH_SIZE, progress=None, restart=False):
+    """Stream a dataset file into the catalog in batches, committing after each.
+
+    Progress is checkpointed in catalog_imports, so running the same import
+    again resumes after the last committed batch, and a finished one is not
+    read again. restart=True reads the file from the start, e.g. for a newer
+    release under the same name; rows already in the catalog are kept.
+    """
+    filename = os.path.basename(path)
+    job = CatalogImport.query.filter_by(source=source, filename=filename).first()
+    if job is None:
+        job = CatalogImport(source=source, filename=filename, rows_read=0, rows_inserted=0, rows_skipped=0)
+        db.session.add(job)
+        db.session.commit()
+    elif restart:
+        job.rows_read = job.rows_inserted = job.rows_skipped = 0
+        job.status = 'running'
+        db.session.commit()
+    elif job.status == 'done':
+        return job
+
+    resume_from = job.rows_read
+    batch = []
+    read = skipped = 0
+
+    def flush():
+        inserted = _insert_ignoring_duplicates(batch) if batch else 0
+        job.rows_read = resume_from + read
+        job.rows_inserted += inserted
+        job.rows_skipped += skipped
+        db.session.commit()
+        batch.clear()
+        if progress:
+            progress(job)
+
+    for position, record in enumerate(iter_records(path)):
+        if position < resume_from:
+            continue
+        read += 1
+        row = normalize(record, source)
+        if row is None:
+            skipped += 1
+        else:
+            batch.append(row)
+        if read % batch_size == 0:
+            flush()
+            skipped = 0
+
+    flush()
+    job.status = 'done'
+    db.session.commit()
+    return job
@@ -0,0 +1,111 @@
+import sqlite3
+import time
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.pool import QueuePool
+
+# Engine and pool profile for the database, driven by the DB_* settings in
+# app/config.py. Each gunicorn worker process gets its own pool, so the
+# connections one deployment can open are
+#     workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW)
+# which has to stay below PostgreSQL's max_connections (see gunicorn.conf.py).
+
+POOL_CHECKOUT_WAIT = Histogram(
+    'db_pool_checkout_wait_seconds',
+    'Time spent waiting for a pooled database connection',
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+POOL_CHECKOUT_TIMEOUTS = Counter(
+    'db_pool_checkout_timeouts_total',
+    'Connection checkouts that gave up after DB_POOL_TIMEOUT'
+)
+POOL_IN_USE = Gauge('db_pool_connections_in_use', 'Pooled connections currently checked out')
+POOL_OPEN = Gauge('db_pool_connections_open', 'Connections currently held by the pool, idle or in use')
+POOL_SIZE = Gauge('db_pool_size', 'Configured pool size (DB_POOL_SIZE)')
+POOL_MAX_OVERFLOW = Gauge('db_pool_max_overflow', 'Configured overflow limit (DB_MAX_OVERFLOW)')
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeout:
+            POOL_CHECKOUT_TIMEOUTS.inc()
+            raise
+        finally:
+            POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started)
+
+
+def engine_options(config):
+    """SQLALCHEMY_ENGINE_OPTIONS for the configured database URI."""
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    backend = url.get_backend_name()
+    options = {'pool_pre_ping': config['DB_POOL_PRE_PING']}
+    pool = {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE']
+    }
+
+    if backend == 'postgresql':
+        options.update(pool)
+        if config['DB_STATEMENT_TIMEOUT_MS']:
+            # Applies to every statement of every request on the connection
+            options['connect_args'] = {'options': f"-c statement_timeout={config['DB_STATEMENT_TIMEOUT_MS']}"}
+    elif backend == 'sqlite' and url.database not in (None, '', ':memory:'):
+        # File databases only; in-memory SQLite must keep Flask-SQLAlchemy's
+        # single shared connection
+        options.update(pool)
+    return options
+
+
+def _sqlite_pragmas(config):
+    pragmas = [
+        f"PRAGMA busy_timeout = {config['SQLITE_BUSY_TIMEOUT_MS']}",
+        "PRAGMA foreign_keys = ON"
+    ]
+    if config['SQLITE_WAL']:
+        # Readers no longer block the writer (and vice versa) across threads/workers
+        pragmas += ["PRAGMA journal_mode = WAL", "PRAGMA synchronous = NORMAL"]
+    return pragmas
+
+
+def instrument(engine, config):
+    pool = engine.pool
+    if isinstance(pool, QueuePool):
+        POOL_IN_USE.set_function(pool.checkedout)
+        POOL_OPEN.set_function(lambda: pool.checkedin() + pool.checkedout())
+        POOL_SIZE.set(pool.size())
+        POOL_MAX_OVERFLOW.set(config['DB_MAX_OVERFLOW'])
+
+    if engine.dialect.name == 'sqlite':
+        pragmas = _sqlite_pragmas(config)
+
+        @event.listens_for(engine, 'connect')
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            if isinstance(dbapi_connection, sqlite3.Connection):
+                cursor = dbapi_connection.cursor()
+                for pragma in pragmas:
+                    cursor.execute(pragma)
+                cursor.close()
+
+
+def configure(app):
+    """Set the engine options from the DB_* config; call before db.init_app(app)."""
+    options = engine_options(app.config)
+    options.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+
+def init_app(app, db):
+    """Instrument the engines Flask-SQLAlchemy created; call after db.init_app(app)."""
+    with app.app_context():
+        for engine in db.engines.values():
+            instrument(engine, app.config)
@@ -0,0 +1,147 @@
+import csv
+import io
+import json
+import time
+from datetime import datetime, timezone
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from app.models import db, GlucoseReading
+from app.services import rollups, timeseries
+
+# Batch ingestion for CGM uploads: parse, validate and de-duplicate a whole
+# upload, then write it with multi-row INSERTs in a single transaction. The
+# unique (user_id, timestamp) constraint settles uploads that race each other:
+# rows another transaction wrote first are skipped and reported as duplicates.
+
+MAX_BATCH_ROWS = 50000
+MIN_VALUE = 10  # mg/dL, below anything a sensor reports
+MAX_VALUE = 1000
+
+
+def parse_body(content_type, body):
+    """Turn a JSON array, NDJSON or CSV request body into a list of raw row dicts."""
+    content_type = (content_type or '').split(';')[0].strip()
+    text = body.decode('utf-8-sig') if isinstance(body, bytes) else body
+
+    if content_type == 'text/csv':
+        return list(csv.DictReader(io.StringIO(text)))
+    if content_type == 'application/x-ndjson':
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    data = json.loads(text)
+    if isinstance(data, dict):
+        data = data.get('readings')
+    if not isinstance(data, list):
+        raise ValueError("Expected a JSON array of readings or {\"readings\": [...]}")
+    return data
+
+
+def validate_row(raw):
+    """Return (value, timestamp, notes) for a raw row or raise ValueError."""
+    if not isinstance(raw, dict):
+        raise ValueError("Row must be an object")
+    try:
+        value = float(raw['value'])
+    except KeyError:
+        raise ValueError("Missing 'value'")
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid value: {raw['value']!r}")
+    if not MIN_VALUE <= value <= MAX_VALUE:
+        raise ValueError(f"Value {value} outside {MIN_VALUE}-{MAX_VALUE} mg/dL")
+
+    if not raw.get('timestamp'):
+        raise ValueError("Missing 'timestamp'")
+    try:
+        timestamp = datetime.fromisoformat(str(raw['timestamp']))
+    except ValueError:
+        raise ValueError(f"Invalid timestamp: {raw['timestamp']!r}")
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+
+    return value, timestamp, raw.get('notes') or ''
+
+
+def _insert_ignoring_duplicates(rows):
+    """Insert the rows, skipping (user_id, timestamp) pairs that already exist; returns the inserted timestamps."""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        stmt = postgresql.insert(GlucoseReading).on_conflict_do_nothing(index_elements=['user_id', 'timestamp'])
+    elif dialect == 'sqlite':
+        stmt = sqlite.insert(GlucoseReading).on_conflict_do_nothing(index_elements=['user_id', 'timestamp'])
+    else:
+        raise RuntimeError(f"Glucose ingest is not supported on {dialect}")
+    # executemany with a list of dicts is batched into multi-row INSERTs
+    return set(db.session.execute(stmt.returning(GlucoseReading.timestamp), rows).scalars())
+
+
+def ingest(user_id, raw_rows):
+    """Validate, de-duplicate on (user_id, timestamp) and insert a batch of readings.
+
+    Invalid and duplicate rows are reported and skipped; the valid rows are
+    written in one transaction. The caller commits.
+    """
+    started = time.perf_counter()
+    statuses = [None] * len(raw_rows)
+    candidates = {}
+
+    for index, raw in enumerate(raw_rows):
+        try:
+            value, timestamp, notes = validate_row(raw)
+        except ValueError as e:
+            statuses[index] = {"index": index, "status": "invalid", "error": str(e)}
+            continue
+        if timestamp in candidates:
+            statuses[index] = {"index": index, "status": "duplicate"}
+            continue
+        candidates[timestamp] = (index, value, notes)
+
+    # One range query finds the timestamps the user already has in this window
+    existing = set()
+    if candidates:
+        existing = set(db.session.execute(
+            select(GlucoseReading.timestamp).where(
+                GlucoseReading.user_id == user_id,
+                GlucoseReading.timestamp >= min(candidates),
+                GlucoseReading.timestamp <= max(candidates)
+            )
+        ).scalars())
+
+    now = datetime.utcnow()
+    rows = []
+    for timestamp, (index, value, notes) in candidates.items():
+        if timestamp in existing:
+            statuses[index] = {"index": index, "status": "duplicate"}
+            continue
+        statuses[index] = {"index": index, "status": "created"}
+        rows.append({
+            'user_id': user_id,
+            'value': value,
+            'timestamp': timestamp,
+            'notes': notes,
+            'created_at': now,
+            'updated_at': now
+        })
+
+    if rows:
+        inserted = _insert_ignoring_duplicates(rows)
+        for timestamp, (index, value, notes) in candidates.items():
+            if timestamp not in existing and timestamp not in inserted:
+                statuses[index] = {"index": index, "status": "duplicate"}
+        rows = [row for row in rows if row['timestamp'] in inserted]
+    
+    if rows:
+        rollups.glucose_batch_added(user_id, rows)
+        timeseries.refresh_days(user_id, {row['timestamp'].date() for row in rows})
+
+    elapsed = time.perf_counter() - started
+    return {
+        "received": len(raw_rows),
+        "created": len(rows),
+        "duplicates": sum(1 for status in statuses if status["status"] == "duplicate"),
+        "invalid": sum(1 for status in statuses if status["status"] == "invalid"),
+        "elapsed_ms": round(elapsed * 1000, 2),
+        "rows_per_second": round(len(raw_rows) / elapsed) if elapsed else None,
+        "first_timestamp": min(row['timestamp'] for row in rows).isoformat() if rows else None,
+        "last_timestamp": max(row['timestamp'] for row in rows).isoformat() if rows else None,
+        "rows": statuses
+    }
@@ -0,0 +1,149 @@
+from datetime import timedelta
+from sqlalchemy import select
+from app.models import db, Meal
+from app.services import timeseries
+
+# Glycemic statistics over the packed glucose chunks. Everything is computed
+# on NumPy arrays decoded straight from the chunk blobs, so a year of
+# 5-minute readings (~105k points) is a few vectorized passes. NumPy is
+# imported on first use rather than at startup (services/startup.py).
+
+TARGET_LOW = 70  # mg/dL
+TARGET_HIGH = 180
+VERY_LOW = 54
+VERY_HIGH = 250
+POSTPRANDIAL_MINUTES = 120
+
+
+def load_arrays(user_id, start, end):
+    """Readings in [start, end] as (epoch_seconds int64, mg/dL float64) arrays."""
+    import numpy as np
+    chunks = timeseries.load_chunks(user_id, start, end)
+    if not chunks:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+    # Chunk blobs are little-endian uint32 / float32; decode each with one view
+    times = np.concatenate([
+        base + np.frombuffer(offsets, dtype='<u4').astype(np.int64)
+        for _, base, offsets, _ in chunks
+    ])
+    values = np.concatenate([
+        np.frombuffer(packed_values, dtype='<f4').astype(np.float64)
+        for _, _, _, packed_values in chunks
+    ])
+    keep = (times >= timeseries.epoch_seconds(start)) & (times <= timeseries.epoch_seconds(end))
+    return times[keep], values[keep]
+
+
+def mage(values, sd):
+    """Mean amplitude of glycemic excursions larger than one standard deviation."""
+    import numpy as np
+    if len(values) < 3 or sd == 0:
+        return 0.0
+    # Turning points are where the direction of change flips (flat runs ignored)
+    steps = np.diff(values)
+    moving = np.flatnonzero(steps)
+    if len(moving) < 2:
+        return 0.0
+    direction = np.sign(steps[moving])
+    turns = moving[1:][direction[1:] != direction[:-1]]
+    extrema = values[np.concatenate(([0], turns, [len(values) - 1]))]
+    amplitudes = np.abs(np.diff(extrema))
+    excursions = amplitudes[amplitudes > sd]
+    return float(excursions.mean()) if len(excursions) else 0.0
+
+
+def summary(values, low=TARGET_LOW, high=TARGET_HIGH):
+    """Time-in-range, variability and GMI for an array of readings (mg/dL)."""
+    import numpy as np
+    count = len(values)
+    if not count:
+        return {"readings_count": 0}
+
+    mean = float(values.mean())
+    sd = float(values.std())
+
+    def percent(mask):
+        return round(float(np.count_nonzero(mask)) * 100 / count, 2)
+
+    return {
+        "readings_count": count,
+        "mean": mean,
+        "sd": sd,
+        "cv": sd / mean * 100 if mean else 0,
+        "gmi": 3.31 + 0.02392 * mean,  # Bergenstal et al. 2018, percent
+        "min": float(values.min()),
+        "max": float(values.max()),
+        "time_in_range": percent((values >= low) & (values <= high)),
+        "time_below_range": percent(values < low),
+        "time_very_low": percent(values < VERY_LOW),
+        "time_above_range": percent(values > high),
+        "time_very_high": percent(values > VERY_HIGH),
+        "mage": mage(values, sd),
+        "range": {"low": low, "high": high}
+    }
+
+
+def incremental_auc(times, values, start, minutes=POSTPRANDIAL_MINUTES):
+    """Area above the pre-meal baseline over the window after `start` (mg/dL*min).
+
+    The baseline and window edges are linearly interpolated; returns None if the
+    readings don't cover the window.
+    """
+    import numpy as np
+    end = start + minutes * 60
+    if not len(times) or times[0] > start or times[-1] < end:
+        return None
+
+    left, right = np.searchsorted(times, [start, end], side='right')
+    window_t = np.concatenate(([start], times[left:right], [end])).astype(np.float64)
+    window_v = np.concatenate(([np.interp(start, times, values)], values[left:right], [np.interp(end, times, values)]))
+
+    # Trapezoids above the baseline; a segment that crosses it only counts
+    # the triangle on the positive side of the crossing
+    rise = window_v - window_v[0]
+    y0, y1, dt = rise[:-1], rise[1:], np.diff(window_t)
+    high, low = np.maximum(y0, y1), np.minimum(y0, y1)
+    spread = np.where(high - low > 0, high - low, 1)
+    area = np.where(low >= 0, (y0 + y1) / 2 * dt, np.where(high > 0, high * high / spread * dt / 2, 0)).sum()
+    return float(area / 60)
+
+
+def glycemic_stats(user_id, start, end, low=TARGET_LOW, high=TARGET_HIGH):
+    _, values = load_arrays(user_id, start, end)
+    stats = summary(values, low, high)
+    stats["start"] = start.isoformat()
+    stats["end"] = end.isoformat()
+    return stats
+
+
+def postprandial(user_id, start, end, minutes=POSTPRANDIAL_MINUTES):
+    """Incremental AUC for every meal in [start, end]."""
+    import numpy as np
+    times, values = load_arrays(user_id, start, end + timedelta(minutes=minutes))
+    meals = db.session.execute(
+        select(Meal.id, Meal.name, Meal.timestamp).where(
+            Meal.user_id == user_id,
+            Meal.timestamp >= start,
+            Meal.timestamp <= end
+        ).order_by(Meal.timestamp)
+    ).all()
+
+    results = []
+    for meal_id, name, timestamp in meals:
+        moment = timeseries.epoch_seconds(timestamp)
+        results.append({
+            "meal_id": meal_id,
+            "name": name,
+            "timestamp": timestamp.isoformat(),
+            "iauc": incremental_auc(times, values, moment, minutes)
+        })
+
+    covered = [result["iauc"] for result in results if result["iauc"] is not None]
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "window_minutes": minutes,
+        "meals": results,
+        "mean_iauc": float(np.mean(covered)) if covered else None
+    }
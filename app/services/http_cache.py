@@ -0,0 +1,117 @@
+import hashlib
+from datetime import datetime, timezone
+from functools import wraps
+from flask import make_response, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from app.models import db, ResourceVersion
+
+# Conditional GETs for the per-user read endpoints. Every write bumps a
+# per-user version counter for the resource it touches (in the same
+# transaction), so a GET can compute its ETag / Last-Modified from one
+# primary-key lookup and answer 304 without running its main query.
+
+RESOURCES = ('foods', 'recipes', 'meals', 'glucose')
+
+
+def _insert():
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        return postgresql.insert
+    if dialect == 'sqlite':
+        return sqlite.insert
+    raise RuntimeError(f"Resource versions are not supported on {dialect}")
+
+
+def bump(user_id, *resources):
+    """Record a change to the user's resources; call before committing the write.
+
+    The new versions are remembered for the rest of the session (see
+    bumped_version()), so per-process caches patched after the commit can tell
+    which version their patch brings them to.
+    """
+    now = datetime.utcnow()
+    bumped = db.session.info.setdefault('bumped_versions', {})
+    insert = _insert()
+    for resource in resources:
+        # One upsert, so two requests making a user's first write of a
+        # resource at the same time cannot both insert the row
+        stmt = insert(ResourceVersion).values(user_id=int(user_id), resource=resource, version=1, updated_at=now)
+        version = db.session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=['user_id', 'resource'],
+                set_={'version': ResourceVersion.version + 1, 'updated_at': now}
+            ).returning(ResourceVersion.version)
+        ).scalar()
+        bumped[(int(user_id), resource)] = version
+
+
+def bumped_version(user_id, resource):
+    """The version this session's bump() gave the resource, or None if it was not bumped."""
+    return db.session.info.get('bumped_versions', {}).get((int(user_id), resource))
+
+
+def current_versions(user_id, resources):
+    rows = db.session.execute(
+        select(ResourceVersion.resource, ResourceVersion.version, ResourceVersion.updated_at).where(
+            ResourceVersion.user_id == user_id,
+            ResourceVersion.resource.in_(resources)
+        )
+    ).all()
+    return {resource: (version, updated_at) for resource, version, updated_at in rows}
+
+
+def validators(user_id, resources):
+    """(etag, last_modified) for the current request over the given resources."""
+    versions = current_versions(user_id, resources)
+    # Same versions + same URL means the same body; the date is part of the key
+    # because several endpoints default to "today"
+    key = '|'.join([
+        str(user_id),
+        request.full_path,
+        datetime.utcnow().date().isoformat(),
+        *(f'{resource}:{versions.get(resource, (0, None))[0]}' for resource in resources)
+    ])
+    etag = hashlib.sha1(key.encode()).hexdigest()
+
+    stamps = [updated_at for _, updated_at in versions.values() if updated_at]
+    last_modified = max(stamps).replace(tzinfo=timezone.utc, microsecond=0) if stamps else None
+    return etag, last_modified
+
+
+def conditional(*resources, requires_args=()):
+    """Decorator for @jwt_required() GET views whose body depends only on `resources`.
+
+    Views whose default window moves with the clock (it ends "now") name the
+    query args that pin it in requires_args; without them the response is
+    served uncached, since the versions alone cannot tell that it changed.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if any(arg not in request.args for arg in requires_args):
+                response = make_response(view(*args, **kwargs))
+                response.headers['Cache-Control'] = 'private, no-store'
+                return response
+            etag, last_modified = validators(get_jwt_identity(), resources)
+
+            not_modified = request.if_none_match.contains_weak(etag) if request.if_none_match else (
+                last_modified is not None
+                and request.if_modified_since is not None
+                and last_modified <= request.if_modified_since
+            )
+            if not_modified:
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag, weak=True)
+            if last_modified:
+                response.last_modified = last_modified
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return wrapper
+    return decorator
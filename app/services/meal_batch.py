@@ -0,0 +1,210 @@
+from datetime import datetime, timezone
+from sqlalchemy import insert, select
+from app.models import db, Food, Meal, MealItem, Recipe
+from app.models import nutrients
+from app.models.nutrients import NUTRIENTS
+from app.services import rollups
+
+# Batch meal logging: validate a whole upload of meals with nested items,
+# resolve every referenced recipe and food with one IN query each, write meals
+# and items with multi-row INSERTs and compute the totals (stored on the meal
+# rows and returned to the client) from the rows already in memory. The batch
+# is all-or-nothing so a client can simply retry it.
+
+MAX_BATCH_MEALS = 1000
+MAX_MEAL_ITEMS = 100
+
+
+def _parse_timestamp(value):
+    try:
+        timestamp = datetime.fromisoformat(str(value))
+    except ValueError:
+        raise ValueError(f"Invalid timestamp: {value!r}")
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+
+def _number(raw, key, default=None):
+    value = raw.get(key, default)
+    if value is None:
+        raise ValueError(f"Missing '{key}'")
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid {key}: {raw[key]!r}")
+    if value < 0:
+        raise ValueError(f"{key} must not be negative")
+    return value
+
+
+def validate_item(raw):
+    """Return (recipe_id, food_id, quantity, amount) for a raw item or raise ValueError."""
+    if not isinstance(raw, dict):
+        raise ValueError("Item must be an object")
+    if (raw.get('recipe_id') is None) == (raw.get('food_id') is None):
+        raise ValueError("Each item needs exactly one of recipe_id or food_id")
+    if raw.get('recipe_id') is not None:
+        return int(raw['recipe_id']), None, _number(raw, 'quantity', 1), None
+    return None, int(raw['food_id']), 1.0, _number(raw, 'amount')
+
+
+def validate_meal(raw):
+    """Return (name, timestamp, notes, items) for a raw meal or raise ValueError."""
+    if not isinstance(raw, dict):
+        raise ValueError("Meal must be an object")
+    if not raw.get('name'):
+        raise ValueError("Missing 'name'")
+    timestamp = _parse_timestamp(raw['timestamp']) if raw.get('timestamp') else datetime.now()
+
+    raw_items = raw.get('items', [])
+    if not isinstance(raw_items, list):
+        raise ValueError("'items' must be a list")
+    if len(raw_items) > MAX_MEAL_ITEMS:
+        raise ValueError(f"More than {MAX_MEAL_ITEMS} items")
+    items = []
+    for position, raw_item in enumerate(raw_items):
+        try:
+            items.append(validate_item(raw_item))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Item {position}: {e}")
+    return str(raw['name']), timestamp, raw.get('notes'), items
+
+
+def _sources(user_id, meals):
+    recipe_ids = {item[0] for meal in meals for item in meal[3] if item[0] is not None}
+    food_ids = {item[1] for meal in meals for item in meal[3] if item[1] is not None}
+    recipes = {}
+    foods = {}
+    if recipe_ids:
+        recipes = {row.id: row for row in db.session.execute(
+            select(Recipe.id, *(getattr(Recipe, nutrient) for nutrient in NUTRIENTS)).where(
+                Recipe.user_id == user_id,
+                Recipe.id.in_(recipe_ids)
+            )
+        )}
+    if food_ids:
+        foods = {row.id: nutrients.per_gram(row) for row in db.session.execute(
+            select(Food.id, Food.version, Food.serving_size, *(getattr(Food, nutrient) for nutrient in NUTRIENTS)).where(
+                Food.user_id == user_id,
+                Food.id.in_(food_ids)
+            )
+        )}
+    return recipes, foods
+
+
+def log(user_id, raw_meals):
+    """Validate and insert a batch of meals with their items; the caller commits.
+
+    Returns (result, errors). When any meal is invalid nothing is written and
+    errors lists {"index", "error"} for each bad meal.
+    """
+    meals = []
+    errors = []
+    for index, raw in enumerate(raw_meals):
+        try:
+            meals.append(validate_meal(raw))
+        except (KeyError, TypeError, ValueError) as e:
+            errors.append({"index": index, "error": str(e)})
+    if errors:
+        return None, errors
+
+    recipes, foods = _sources(user_id, meals)
+    item_totals = []
+    for index, (name, timestamp, notes, items) in enumerate(meals):
+        per_item = []
+        for recipe_id, food_id, quantity, amount in items:
+            if recipe_id is not None:
+                if recipe_id not in recipes:
+                    errors.append({"index": index, "error": f"Recipe {recipe_id} not found"})
+                    continue
+                recipe = recipes[recipe_id]
+                per_item.append({nutrient: getattr(recipe, nutrient) * quantity for nutrient in NUTRIENTS})
+            else:
+                if food_id not in foods:
+                    errors.append({"index": index, "error": f"Food {food_id} not found"})
+                    continue
+                per_item.append(foods[food_id].scaled(amount))
+        item_totals.append(per_item)
+    if errors:
+        return None, errors
+
+    meal_totals = []
+    for per_item in item_totals:
+        totals = nutrients.zero()
+        for values in per_item:
+            for nutrient in NUTRIENTS:
+                totals[nutrient] += values[nutrient]
+        meal_totals.append(totals)
+
+    now = datetime.utcnow()
+    meal_ids = db.session.execute(
+        insert(Meal).returning(Meal.id, sort_by_parameter_order=True),
+        [{
+            'user_id': user_id,
+            'name': name,
+            'timestamp': timestamp,
+            'notes': notes,
+            **totals,
+            'created_at': now,
+            'updated_at': now
+        } for (name, timestamp, notes, items), totals in zip(meals, meal_totals)]
+    ).scalars().all()
+
+    item_rows = [{
+        'meal_id': meal_id,
+        'recipe_id': recipe_id,
+        'food_id': food_id,
+        'quantity': quantity,
+        'amount': amount,
+        'created_at': now,
+        'updated_at': now
+    } for meal_id, meal in zip(meal_ids, meals) for recipe_id, food_id, quantity, amount in meal[3]]
+    item_ids = []
+    if item_rows:
+        item_ids = db.session.execute(
+            insert(MealItem).returning(MealItem.id, sort_by_parameter_order=True),
+            item_rows
+        ).scalars().all()
+
+    created = []
+    day_totals = []
+    pending_items = iter(zip(item_ids, item_rows))
+    for meal_id, (name, timestamp, notes, items), per_item, totals in zip(meal_ids, meals, item_totals, meal_totals):
+        meal_items = []
+        for values in per_item:
+            item_id, row = next(pending_items)
+            meal_items.append({
+                'id': item_id,
+                'recipe_id': row['recipe_id'],
+                'food_id': row['food_id'],
+                'quantity': row['quantity'],
+                'amount': row['amount'],
+                'calories_total': values['calories'],
+                'carbs_total': values['carbs'],
+                'proteins_total': values['proteins'],
+                'fats_total': values['fats']
+            })
+        day_totals.append((timestamp.date(), totals))
+        created.append({
+            'id': meal_id,
+            'name': name,
+            'timestamp': timestamp.isoformat(),
+            'notes': notes,
+            'total_calories': totals['calories'],
+            'total_carbs': totals['carbs'],
+            'total_proteins': totals['proteins'],
+            'total_fats': totals['fats'],
+            'meal_items': meal_items,
+            'user_id': user_id,
+            'created_at': now.isoformat(),
+            'updated_at': now.isoformat()
+        })
+
+    rollups.meal_batch_added(user_id, day_totals)
+    return {
+        "created": len(created),
+        "first_timestamp": min(meal[1] for meal in meals).isoformat() if meals else None,
+        "last_timestamp": max(meal[1] for meal in meals).isoformat() if meals else None,
+        "meals": created
+    }, []
@@ -0,0 +1,183 @@
+import logging
+import queue
+import threading
+from bisect import bisect_right
+from datetime import timedelta
+from flask import current_app
+from sqlalchemy import delete, insert, select, update
+from app.models import db, GlucoseReading, Meal, MealResponse
+from app.services import http_cache
+
+# Links glucose readings to the meal they follow (GlucoseReading.meal_id) and
+# precomputes each meal's response (MealResponse), so the response endpoint
+# is a primary-key lookup. Linking is a merge-join of the user's meals and
+# readings, both sorted by time, over the window around a change.
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW_MINUTES = 180
+BASELINE_LOOKBACK = timedelta(minutes=30)
+
+
+def window():
+    return timedelta(minutes=current_app.config.get('MEAL_RESPONSE_WINDOW_MINUTES', DEFAULT_WINDOW_MINUTES))
+
+
+def compute_response(meal_time, readings, pre_meal_value):
+    """Baseline, peak, time-to-peak and return-to-baseline from a meal's (timestamp, value) readings."""
+    if not readings:
+        return {'readings_count': 0, 'baseline': pre_meal_value, 'peak': None, 'time_to_peak': None, 'return_to_baseline': None}
+
+    baseline = pre_meal_value if pre_meal_value is not None else readings[0][1]
+    peak_index = max(range(len(readings)), key=lambda i: readings[i][1])
+    peak_time, peak = readings[peak_index]
+
+    returned = None
+    for timestamp, value in readings[peak_index + 1:]:
+        if value <= baseline:
+            returned = int((timestamp - meal_time).total_seconds() // 60)
+            break
+
+    return {
+        'readings_count': len(readings),
+        'baseline': baseline,
+        'peak': peak,
+        'time_to_peak': int((peak_time - meal_time).total_seconds() // 60),
+        'return_to_baseline': returned
+    }
+
+
+def link_range(user_id, start=None, end=None):
+    """Relink readings and recompute responses for meals in [start, end] (caller commits).
+
+    Every reading that a meal in the range could own is relinked, so changes
+    at either edge of the range are picked up too.
+    """
+    span = window()
+    meal_query = select(Meal.id, Meal.timestamp).where(Meal.user_id == user_id)
+    reading_query = select(
+        GlucoseReading.id, GlucoseReading.timestamp, GlucoseReading.value, GlucoseReading.meal_id
+    ).where(GlucoseReading.user_id == user_id)
+
+    if start is not None:
+        meal_query = meal_query.where(Meal.timestamp >= start - span)
+        reading_query = reading_query.where(GlucoseReading.timestamp >= start - BASELINE_LOOKBACK)
+    if end is not None:
+        meal_query = meal_query.where(Meal.timestamp <= end + span)
+        reading_query = reading_query.where(GlucoseReading.timestamp <= end + span)
+
+    meals = db.session.execute(meal_query.order_by(Meal.timestamp, Meal.id)).all()
+    readings = db.session.execute(reading_query.order_by(GlucoseReading.timestamp)).all()
+    meal_times = [meal.timestamp for meal in meals]
+    reading_times = [reading.timestamp for reading in readings]
+
+    # Each reading belongs to the latest meal at or before it, if within the window
+    owned = {meal.id: [] for meal in meals}
+    changes = []
+    for reading in readings:
+        index = bisect_right(meal_times, reading.timestamp) - 1
+        meal_id = None
+        if index >= 0 and reading.timestamp - meal_times[index] <= span:
+            meal_id = meals[index].id
+            owned[meal_id].append((reading.timestamp, reading.value))
+        if start is not None and reading.timestamp < start:
+            continue  # only loaded as baseline context
+        if reading.meal_id != meal_id:
+            changes.append({'id': reading.id, 'meal_id': meal_id})
+
+    if changes:
+        db.session.execute(update(GlucoseReading), changes)
+        http_cache.bump(user_id, 'glucose')  # readings serialize their meal_id
+
+    targets = [
+        meal for meal in meals
+        if (start is None or meal.timestamp >= start) and (end is None or meal.timestamp <= end)
+    ]
+    if not targets:
+        return 0
+
+    responses = []
+    for meal in targets:
+        # Baseline is the last reading shortly before the meal
+        before = bisect_right(reading_times, meal.timestamp) - 1
+        pre_meal_value = None
+        if before >= 0 and meal.timestamp - reading_times[before] <= BASELINE_LOOKBACK:
+            pre_meal_value = readings[before].value
+        response = compute_response(meal.timestamp, owned[meal.id], pre_meal_value)
+        response.update(meal_id=meal.id, user_id=user_id)
+        responses.append(response)
+
+    db.session.execute(delete(MealResponse).where(MealResponse.meal_id.in_([meal.id for meal in targets])))
+    db.session.execute(insert(MealResponse), responses)
+    return len(responses)
+
+
+def meal_deleted(meal):
+    """Detach a meal's readings and drop its response before the meal row goes."""
+    db.session.execute(update(GlucoseReading).where(GlucoseReading.meal_id == meal.id).values(meal_id=None))
+    db.session.execute(delete(MealResponse).where(MealResponse.meal_id == meal.id))
+
+
+class LinkerWorker:
+    """Per-process background thread that relinks the windows around committed writes.
+
+    Pending windows for the same user are merged, so a burst of writes costs
+    one link pass.
+    """
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.thread = None
+        self.app = None
+
+    def enqueue(self, app, user_id, start, end):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.app = app
+                self.thread = threading.Thread(target=self._run, name='meal-response-linker', daemon=True)
+                self.thread.start()
+        self.queue.put((user_id, start, end))
+
+    def _drain(self):
+        pending = {}
+        user_id, start, end = self.queue.get()
+        while True:
+            if user_id in pending:
+                low, high = pending[user_id]
+                start, end = min(low, start), max(high, end)
+            pending[user_id] = (start, end)
+            try:
+                user_id, start, end = self.queue.get_nowait()
+            except queue.Empty:
+                return pending
+
+    def _run(self):
+        while True:
+            for user_id, (start, end) in self._drain().items():
+                with self.app.app_context():
+                    try:
+                        link_range(user_id, start, end)
+                        db.session.commit()
+                    except Exception:
+                        db.session.rollback()
+                        logger.exception("Meal response linking failed for user %s", user_id)
+
+
+worker = LinkerWorker()
+
+
+def schedule(user_id, *timestamps):
+    """Relink around the given meal/reading times; call after the write is committed."""
+    timestamps = [timestamp for timestamp in timestamps if timestamp is not None]
+    if not timestamps:
+        return
+    # Meals up to one window earlier may own (or lose) readings at these times,
+    # and a reading can be the baseline of a meal shortly after it
+    start, end = min(timestamps) - window(), max(timestamps) + BASELINE_LOOKBACK
+
+    if current_app.config.get('MEAL_RESPONSE_LINK_ASYNC', True):
+        worker.enqueue(current_app._get_current_object(), user_id, start, end)
+    else:
+        link_range(user_id, start, end)
+        db.session.commit()
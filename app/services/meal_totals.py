@@ -0,0 +1,108 @@
+from sqlalchemy import func, select, update
+from app.models import db, Food, Meal, MealItem, Recipe
+from app.models.nutrients import NUTRIENTS
+from app.services import rollups
+
+# Meal totals are stored on the meal row (Meal.calories, .carbs, ...). The meal
+# write routes refresh them from the items in Python (Meal.refresh_totals);
+# when a recipe's or food's nutrients change, every meal using it is
+# recomputed here with one grouped query per batch, and the daily rollups are
+# shifted by the difference, all in the caller's transaction.
+
+BATCH_SIZE = 500
+TOLERANCE = 1e-6
+
+
+def _computed(name):
+    # Same arithmetic as MealItem.totals(): servings of a recipe or grams of a food
+    from_recipe = func.coalesce(getattr(Recipe, name) * MealItem.quantity, 0)
+    serving_size = func.coalesce(func.nullif(Food.serving_size, 0), 1)
+    from_food = func.coalesce(getattr(Food, name) / serving_size * MealItem.amount, 0)
+    return func.coalesce(func.sum(from_recipe + from_food), 0).label(f'computed_{name}')
+
+
+def _stored_and_computed(meal_ids):
+    stmt = select(
+        Meal.id,
+        Meal.user_id,
+        Meal.timestamp,
+        *(getattr(Meal, name) for name in NUTRIENTS),
+        *(_computed(name) for name in NUTRIENTS)
+    ).select_from(Meal).outerjoin(
+        MealItem, MealItem.meal_id == Meal.id
+    ).outerjoin(
+        Recipe, Recipe.id == MealItem.recipe_id
+    ).outerjoin(
+        Food, Food.id == MealItem.food_id
+    ).where(Meal.id.in_(meal_ids)).group_by(Meal.id)
+    return db.session.execute(stmt).mappings()
+
+
+def _differs(stored, computed):
+    return abs((stored or 0) - computed) > TOLERANCE * max(1, abs(computed))
+
+
+def stale(meal_ids):
+    """Rows for the meals whose stored totals disagree with their items."""
+    return [
+        row for row in _stored_and_computed(meal_ids)
+        if any(_differs(row[name], row[f'computed_{name}']) for name in NUTRIENTS)
+    ]
+
+
+def recompute(meal_ids, shift_rollups=True):
+    """Rewrite the stored totals of the given meals; returns the (user_id, day) pairs that changed.
+
+    With shift_rollups the daily rollups move by the same difference; repairs
+    that cannot trust the rollups either pass False and rebuild those days.
+    """
+    changed = set()
+    meal_ids = list(meal_ids)
+    for start in range(0, len(meal_ids), BATCH_SIZE):
+        rows = stale(meal_ids[start:start + BATCH_SIZE])
+        if not rows:
+            continue
+        db.session.execute(update(Meal), [
+            {'id': row['id'], **{name: row[f'computed_{name}'] for name in NUTRIENTS}}
+            for row in rows
+        ])
+        deltas = {}
+        for row in rows:
+            key = (row['user_id'], row['timestamp'].date())
+            delta = deltas.setdefault(key, dict.fromkeys(NUTRIENTS, 0))
+            for name in NUTRIENTS:
+                delta[name] += row[f'computed_{name}'] - (row[name] or 0)
+        if shift_rollups:
+            for (user_id, day), delta in deltas.items():
+                rollups.meal_totals_shifted(user_id, day, delta)
+        changed.update(deltas)
+    return changed
+
+
+def source_changed(column, *source_ids):
+    """Fan out recipe/food nutrient changes to the meals using them.
+
+    `column` is MealItem.recipe_id or MealItem.food_id. Returns the days whose
+    totals changed so the caller can invalidate caches after committing.
+    """
+    source_ids = list(source_ids)
+    meal_ids = set()
+    for start in range(0, len(source_ids), BATCH_SIZE):
+        meal_ids.update(db.session.execute(
+            select(MealItem.meal_id).where(column.in_(source_ids[start:start + BATCH_SIZE])).distinct()
+        ).scalars())
+    return {day for user_id, day in recompute(sorted(meal_ids))}
+
+
+def iter_meal_ids(user_id=None):
+    """All meal ids (optionally of one user) in batches, by keyset on id."""
+    last_id = 0
+    while True:
+        stmt = select(Meal.id).where(Meal.id > last_id)
+        if user_id is not None:
+            stmt = stmt.where(Meal.user_id == user_id)
+        batch = db.session.execute(stmt.order_by(Meal.id).limit(BATCH_SIZE)).scalars().all()
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1]
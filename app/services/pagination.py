@@ -0,0 +1,100 @@
+import base64
+import json
+from datetime import datetime
+from flask import Response, jsonify, request, stream_with_context
+from sqlalchemy import tuple_
+from app.services import serializer
+
+# Keyset pagination over (timestamp, id), newest first. The cursor is the
+# position of the last row of a page, so fetching the next page is an index
+# range scan no matter how deep the client has paged.
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+STREAM_BATCH_SIZE = 500
+STREAM_FORMATS = ('ndjson', 'json')
+
+
+def encode_cursor(timestamp, row_id):
+    raw = f'{timestamp.isoformat()}|{row_id}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor; raises ValueError on malformed input."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        timestamp, row_id = raw.split('|')
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def paginate(query, timestamp_column, id_column, limit, cursor=None):
+    """Return (rows, next_cursor) for one page; next_cursor is None on the last page."""
+    if cursor:
+        query = query.filter(tuple_(timestamp_column, id_column) < decode_cursor(cursor))
+    rows = query.order_by(timestamp_column.desc(), id_column.desc()).limit(limit + 1).all()
+
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, timestamp_column.key), getattr(last, id_column.key))
+
+
+def _to_dicts(rows):
+    return [row.to_dict() for row in rows]
+
+
+def stream(query, timestamp_column, id_column, fmt='ndjson', serialize=_to_dicts):
+    """Yield the serialized rows chunk by chunk from a server-side cursor."""
+    rows = query.order_by(timestamp_column.desc(), id_column.desc()).yield_per(STREAM_BATCH_SIZE)
+    batches = serializer.iter_batches(rows, STREAM_BATCH_SIZE)
+    if fmt == 'ndjson':
+        for batch in batches:
+            yield ''.join(json.dumps(item) + '\n' for item in serialize(batch))
+        return
+
+    yield '['
+    separator = ''
+    for batch in batches:
+        for item in serialize(batch):
+            yield separator + json.dumps(item)
+            separator = ','
+    yield ']'
+
+
+def list_response(query, timestamp_column, id_column, projection=None):
+    """Build the response for a list endpoint from the request's paging args.
+
+    ?stream=ndjson|json streams every row; ?limit / ?cursor return one page as
+    {"items": [...], "next_cursor": ...}; with neither the full list is returned.
+    With a serializer.Projection only its columns are fetched, no ORM instances.
+    """
+    serialize = _to_dicts
+    if projection is not None:
+        query = projection.select(query)
+        serialize = projection.serialize
+
+    fmt = request.args.get('stream')
+    if fmt:
+        if fmt not in STREAM_FORMATS:
+            return jsonify({"msg": f"stream must be one of {', '.join(STREAM_FORMATS)}"}), 400
+        mimetype = 'application/x-ndjson' if fmt == 'ndjson' else 'application/json'
+        return Response(stream_with_context(stream(query, timestamp_column, id_column, fmt, serialize)), mimetype=mimetype)
+
+    if 'limit' not in request.args and 'cursor' not in request.args:
+        rows = query.order_by(timestamp_column.desc(), id_column.desc()).all()
+        return serializer.json_response(serialize(rows))
+
+    try:
+        limit = min(max(int(request.args.get('limit', DEFAULT_LIMIT)), 1), MAX_LIMIT)
+        rows, next_cursor = paginate(query, timestamp_column, id_column, limit, request.args.get('cursor'))
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+
+    return serializer.json_response({
+        "items": serialize(rows),
+        "next_cursor": next_cursor
+    })
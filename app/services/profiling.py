@@ -0,0 +1,190 @@
+import logging
+import time
+import tracemalloc
+from contextlib import contextmanager
+from flask import current_app, g, has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+from prometheus_client import Histogram
+from sqlalchemy import event
+
+# Per-request profile: SQL statements, time spent in the database, rows the
+# database returned, time spent serializing and (opt-in) peak Python
+# allocation. Every request feeds the histograms below, labelled by endpoint;
+# when PROFILING_SERVER_TIMING allows it the numbers are also returned in a
+# Server-Timing header, readable in the browser's network panel:
+#
+#   PROFILING_SERVER_TIMING = 'header'  only for requests sent with X-Profile: 1 (default)
+#                             'always'  on every response
+#                             'off'     never
+#
+# Statements slower than SLOW_QUERY_MS are logged to 'app.slow_queries' with
+# the route that ran them. Rows come from the DBAPI cursor's rowcount, which
+# psycopg2 reports for SELECTs (it buffers results); SQLite only reports it for
+# writes. Peak allocation uses tracemalloc, which slows the request down, so it
+# is only measured for X-Profile requests or with PROFILING_ALLOCATIONS on.
+
+PROFILE_HEADER = 'X-Profile'
+SQL_TEXT_LIMIT = 500
+
+slow_query_log = logging.getLogger('app.slow_queries')
+
+SQL_STATEMENTS = Histogram(
+    'request_sql_statements', 'SQL statements executed per request', ['endpoint'],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144)
+)
+DB_SECONDS = Histogram(
+    'request_db_seconds', 'Time spent in the database per request', ['endpoint'],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+)
+DB_ROWS = Histogram(
+    'request_db_rows', 'Rows returned by the database per request', ['endpoint'],
+    buckets=(0, 1, 10, 50, 100, 500, 1000, 5000, 10000, 50000)
+)
+SERIALIZE_SECONDS = Histogram(
+    'request_serialize_seconds', 'Time spent building and encoding response payloads per request', ['endpoint'],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+)
+PEAK_ALLOCATION = Histogram(
+    'request_peak_allocation_bytes', 'Peak Python memory allocated while handling a request', ['endpoint'],
+    buckets=(2 ** 16, 2 ** 18, 2 ** 20, 2 ** 22, 2 ** 24, 2 ** 26, 2 ** 28)
+)
+
+
+class Profile:
+    __slots__ = ('started', 'statements', 'db_time', 'rows', 'serialize_time', 'trace_memory', 'peak_bytes')
+
+    def __init__(self, trace_memory):
+        self.started = time.perf_counter()
+        self.statements = 0
+        self.db_time = 0.0
+        self.rows = 0
+        self.serialize_time = 0.0
+        self.trace_memory = trace_memory
+        self.peak_bytes = None
+
+
+def current():
+    """The profile of the request being handled, or None (CLI, background threads)."""
+    if has_request_context():
+        return g.get('_profile')
+    return None
+
+
+@contextmanager
+def serializing():
+    """Count the enclosed block as serialization (minus any SQL it runs)."""
+    profile = current()
+    if profile is None:
+        yield
+        return
+    started = time.perf_counter()
+    db_time = profile.db_time
+    try:
+        yield
+    finally:
+        profile.serialize_time += time.perf_counter() - started - (profile.db_time - db_time)
+
+
+class ProfiledJSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider, with jsonify() encoding counted as serialization."""
+
+    def dumps(self, obj, **kwargs):
+        with serializing():
+            return super().dumps(obj, **kwargs)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('_profile_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['_profile_started'].pop()
+    profile = current()
+    if profile is not None:
+        profile.statements += 1
+        profile.db_time += elapsed
+        if cursor.rowcount > 0:
+            profile.rows += cursor.rowcount
+
+    threshold = current_app.config.get('SLOW_QUERY_MS', 250) if has_request_context() else None
+    if threshold is not None and elapsed * 1000 >= threshold:
+        slow_query_log.warning(
+            "slow query %.1f ms in %s %s (%s): %s",
+            elapsed * 1000,
+            request.method,
+            request.path,
+            request.endpoint or 'unknown',
+            ' '.join(statement.split())[:SQL_TEXT_LIMIT]
+        )
+
+
+def _wants_server_timing():
+    mode = current_app.config.get('PROFILING_SERVER_TIMING', 'header')
+    return mode == 'always' or (mode == 'header' and request.headers.get(PROFILE_HEADER) == '1')
+
+
+def _start_profile():
+    trace_memory = current_app.config.get('PROFILING_ALLOCATIONS', False) or request.headers.get(PROFILE_HEADER) == '1'
+    if trace_memory:
+        if tracemalloc.is_tracing():
+            # Another request on this process is already tracing; its peak
+            # would be mixed into ours
+            trace_memory = False
+        else:
+            tracemalloc.start()
+    g._profile = Profile(trace_memory)
+
+
+def _stop_tracing(profile):
+    if profile.trace_memory:
+        profile.peak_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        profile.trace_memory = False
+
+
+def _finish_profile(response):
+    profile = g.pop('_profile', None)
+    if profile is None:
+        return response
+    _stop_tracing(profile)
+
+    endpoint = request.endpoint or 'unknown'
+    SQL_STATEMENTS.labels(endpoint).observe(profile.statements)
+    DB_SECONDS.labels(endpoint).observe(profile.db_time)
+    DB_ROWS.labels(endpoint).observe(profile.rows)
+    SERIALIZE_SECONDS.labels(endpoint).observe(profile.serialize_time)
+    if profile.peak_bytes is not None:
+        PEAK_ALLOCATION.labels(endpoint).observe(profile.peak_bytes)
+
+    if _wants_server_timing():
+        total = time.perf_counter() - profile.started
+        metrics = [
+            f'db;dur={profile.db_time * 1000:.2f};desc="{profile.statements} queries, {profile.rows} rows"',
+            f'ser;dur={profile.serialize_time * 1000:.2f};desc="serialize"',
+            f'app;dur={(total - profile.db_time - profile.serialize_time) * 1000:.2f};desc="other"',
+            f'total;dur={total * 1000:.2f}'
+        ]
+        if profile.peak_bytes is not None:
+            metrics.append(f'mem;desc="peak {profile.peak_bytes / 1048576:.2f} MiB"')
+        response.headers.add('Server-Timing', ', '.join(metrics))
+    return response
+
+
+def _teardown(exc):
+    # Requests that failed before after_request still stop tracemalloc
+    profile = g.pop('_profile', None)
+    if profile is not None:
+        _stop_tracing(profile)
+
+
+def init_app(app, db):
+    """Install the request hooks, JSON provider and SQL listeners; call after db.init_app(app)."""
+    app.json = ProfiledJSONProvider(app)
+    app.before_request(_start_profile)
+    app.after_request(_finish_profile)
+    app.teardown_request(_teardown)
+    with app.app_context():
+        for engine in db.engines.values():
+            if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+                event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+                event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
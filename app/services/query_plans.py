@@ -0,0 +1,142 @@
+import click
+from datetime import date, datetime, timedelta
+from flask.cli import with_appcontext
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from app.models import db, DailyRollup, Food, GlucoseChunk, GlucoseReading, Meal, MealItem, MealResponse, Recipe, RecipeIngredient
+
+# EXPLAIN checks for the hot queries of the API. Each query below has the same
+# shape as the one the routes/services run; the check fails when any of them
+# has to read a whole table instead of an index. On PostgreSQL sequential scans
+# are disabled for the check, so a Seq Scan in the plan means no usable index
+# exists (small dev tables would otherwise make the planner prefer one anyway).
+
+
+class Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain, 'postgresql')
+def _explain_postgresql(element, compiler, **kw):
+    return 'EXPLAIN (FORMAT JSON) ' + compiler.process(element.statement, **kw)
+
+
+@compiles(Explain, 'sqlite')
+def _explain_sqlite(element, compiler, **kw):
+    return 'EXPLAIN QUERY PLAN ' + compiler.process(element.statement, **kw)
+
+
+def hot_queries(user_id=1):
+    end = datetime(2026, 1, 31)
+    start = end - timedelta(days=30)
+    return {
+        'meals page': select(Meal.id, Meal.timestamp).where(
+            Meal.user_id == user_id,
+            Meal.timestamp >= start,
+            Meal.timestamp <= end
+        ).order_by(Meal.timestamp.desc(), Meal.id.desc()).limit(51),
+        'meals next page': select(Meal.id, Meal.timestamp).where(
+            Meal.user_id == user_id,
+            tuple_(Meal.timestamp, Meal.id) < (end, 1000)
+        ).order_by(Meal.timestamp.desc(), Meal.id.desc()).limit(51),
+        'meal items of a page': select(MealItem.id, MealItem.quantity).where(
+            MealItem.meal_id.in_([1, 2, 3])
+        ),
+        'meal totals by day': select(
+            func.date(Meal.timestamp),
+            func.sum(Meal.calories)
+        ).where(
+            Meal.user_id == user_id,
+            Meal.timestamp >= start,
+            Meal.timestamp < end
+        ).group_by(func.date(Meal.timestamp)),
+        'meals using a recipe': select(MealItem.meal_id).where(MealItem.recipe_id == 1).distinct(),
+        'meals using a food': select(MealItem.meal_id).where(MealItem.food_id == 1).distinct(),
+        'recipes using a food': select(RecipeIngredient.recipe_id).where(RecipeIngredient.food_id == 1),
+        'recipes using a recipe': select(RecipeIngredient.recipe_id).where(RecipeIngredient.sub_recipe_id == 1),
+        'ingredients of recipes': select(RecipeIngredient.food_id, RecipeIngredient.amount).where(
+            RecipeIngredient.recipe_id.in_([1, 2, 3])
+        ),
+        'glucose page': select(GlucoseReading.id, GlucoseReading.timestamp).where(
+            GlucoseReading.user_id == user_id,
+            GlucoseReading.timestamp >= start,
+            GlucoseReading.timestamp <= end
+        ).order_by(GlucoseReading.timestamp.desc(), GlucoseReading.id.desc()).limit(51),
+        'glucose next page': select(GlucoseReading.id, GlucoseReading.timestamp).where(
+            GlucoseReading.user_id == user_id,
+            tuple_(GlucoseReading.timestamp, GlucoseReading.id) < (end, 1000)
+        ).order_by(GlucoseReading.timestamp.desc(), GlucoseReading.id.desc()).limit(51),
+        'glucose day values': select(GlucoseReading.timestamp, GlucoseReading.value).where(
+            GlucoseReading.user_id == user_id,
+            GlucoseReading.timestamp >= end - timedelta(days=1),
+            GlucoseReading.timestamp < end
+        ).order_by(GlucoseReading.timestamp),
+        'glucose of a meal': select(GlucoseReading.timestamp, GlucoseReading.value).where(
+            GlucoseReading.meal_id == 1
+        ),
+        'foods of a user': select(Food.id, Food.name).where(Food.user_id == user_id),
+        'recipes of a user': select(Recipe.id, Recipe.name).where(Recipe.user_id == user_id),
+        'rollups range': select(DailyRollup.day, DailyRollup.calories).where(
+            DailyRollup.user_id == user_id,
+            DailyRollup.day >= date(2026, 1, 1),
+            DailyRollup.day <= date(2026, 1, 31)
+        ),
+        'glucose chunks range': select(GlucoseChunk.day, GlucoseChunk.values).where(
+            GlucoseChunk.user_id == user_id,
+            GlucoseChunk.day >= date(2026, 1, 1),
+            GlucoseChunk.day <= date(2026, 1, 31)
+        ),
+        'meal responses of a user': select(MealResponse.meal_id).where(MealResponse.user_id == user_id)
+    }
+
+
+def _postgresql_full_scans(plan):
+    scans = []
+    if plan.get('Node Type') == 'Seq Scan':
+        scans.append(plan.get('Relation Name'))
+    for child in plan.get('Plans', ()):
+        scans.extend(_postgresql_full_scans(child))
+    return scans
+
+
+def full_scans(statement):
+    """Tables the plan for `statement` reads in full."""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        db.session.execute(db.text('SET LOCAL enable_seqscan = off'))
+        (plan,), = db.session.execute(Explain(statement)).all()
+        return _postgresql_full_scans(plan[0]['Plan'])
+    if dialect == 'sqlite':
+        # Rows are (id, parent, notused, detail); full reads show up as "SCAN <table>"
+        details = [row[3] for row in db.session.execute(Explain(statement))]
+        return [detail.split()[1] for detail in details if detail.startswith('SCAN ')]
+    raise RuntimeError(f"Query plan checks are not supported on {dialect}")
+
+
+def check():
+    """Return {query name: [fully scanned tables]} for the failing hot queries."""
+    failures = {}
+    try:
+        for name, statement in hot_queries().items():
+            scans = full_scans(statement)
+            if scans:
+                failures[name] = scans
+    finally:
+        db.session.rollback()
+    return failures
+
+
+@click.command('check-query-plans')
+@with_appcontext
+def check_query_plans():
+    """Fail if any hot query's plan falls back to a full table scan."""
+    failures = check()
+    for name in hot_queries():
+        status = f"FULL SCAN of {', '.join(failures[name])}" if name in failures else "ok"
+        click.echo(f"{name:28} {status}")
+    if failures:
+        raise SystemExit(1)
@@ -0,0 +1,216 @@
+from collections import defaultdict, deque
+from sqlalchemy import or_, select, update
+from app.models import db, Food, MealItem, Recipe, RecipeIngredient
+from app.models import nutrients
+from app.models.nutrients import NUTRIENTS
+from app.services import meal_totals
+
+# Recipes form a DAG: a recipe's ingredient items are grams of a food or
+# servings of another recipe. Per-serving nutrients of a recipe with items are
+# derived bottom-up (sub-recipes before the recipes using them); when a food or
+# recipe changes, only the recipes above it are recomputed, then the meals
+# using any recipe whose values moved (services/meal_totals.py).
+#
+# The graph code works on plain dicts so it can be exercised without a
+# database (benchmarks/recipe_graph.py):
+#   ingredients  {recipe_id: [(FOOD, food_id, grams) | (RECIPE, recipe_id, servings)]}
+#   servings     {recipe_id: servings the items make}
+#   foods        {food_id: per-gram values aligned with NUTRIENTS}
+#   known        {recipe_id: per-serving values} for sub-recipes not recomputed
+
+FOOD = 'food'
+RECIPE = 'recipe'
+BATCH_SIZE = 500
+TOLERANCE = 1e-6
+
+
+class CycleError(ValueError):
+    def __init__(self, cycle):
+        self.cycle = cycle
+        super().__init__("Recipe cycle: " + " -> ".join(str(recipe_id) for recipe_id in cycle))
+
+
+def _find_cycle(remaining, ingredients):
+    # Every recipe left over by Kahn's algorithm uses another left-over recipe,
+    # so walking those edges must eventually revisit a recipe
+    path = []
+    seen = {}
+    current = next(iter(remaining))
+    while current not in seen:
+        seen[current] = len(path)
+        path.append(current)
+        current = next(
+            source_id for kind, source_id, scale in ingredients[current]
+            if kind == RECIPE and source_id in remaining
+        )
+    return path[seen[current]:] + [current]
+
+
+def topological_order(recipe_ids, ingredients):
+    """Order recipe_ids so each comes after the sub-recipes (within the set) it uses.
+
+    Raises CycleError when the recipes do not form a DAG.
+    """
+    waiting = dict.fromkeys(recipe_ids, 0)
+    users = defaultdict(list)
+    for recipe_id in waiting:
+        for kind, source_id, scale in ingredients.get(recipe_id, ()):
+            if kind == RECIPE and source_id in waiting:
+                waiting[recipe_id] += 1
+                users[source_id].append(recipe_id)
+
+    ready = deque(recipe_id for recipe_id, count in waiting.items() if count == 0)
+    order = []
+    while ready:
+        recipe_id = ready.popleft()
+        order.append(recipe_id)
+        for user in users[recipe_id]:
+            waiting[user] -= 1
+            if waiting[user] == 0:
+                ready.append(user)
+
+    if len(order) < len(waiting):
+        placed = set(order)
+        raise CycleError(_find_cycle([recipe_id for recipe_id in waiting if recipe_id not in placed], ingredients))
+    return order
+
+
+def rollup(order, ingredients, servings, foods, known):
+    """Per-serving values of the recipes in `order` (a topological order).
+
+    Each recipe is computed once and memoized, so a sub-recipe shared by many
+    recipes costs nothing extra.
+    """
+    values = dict(known)
+    size = len(NUTRIENTS)
+    for recipe_id in order:
+        totals = [0.0] * size
+        for kind, source_id, scale in ingredients.get(recipe_id, ()):
+            source = foods[source_id] if kind == FOOD else values[source_id]
+            for i in range(size):
+                totals[i] += source[i] * scale
+        per_serving = servings.get(recipe_id) or 1
+        values[recipe_id] = tuple(total / per_serving for total in totals)
+    return {recipe_id: values[recipe_id] for recipe_id in order}
+
+
+def dependents(users_of, start):
+    """Recipes reachable upwards from `start` ((kind, id) keys) through users_of."""
+    found = set()
+    queue = deque(start)
+    while queue:
+        for recipe_id in users_of.get(queue.popleft(), ()):
+            if recipe_id not in found:
+                found.add(recipe_id)
+                queue.append((RECIPE, recipe_id))
+    return found
+
+
+# Database side
+def _batched(ids):
+    ids = list(ids)
+    for start in range(0, len(ids), BATCH_SIZE):
+        yield ids[start:start + BATCH_SIZE]
+
+
+def _pairs(food_ids, recipe_ids):
+    for start in range(0, max(len(food_ids), len(recipe_ids)), BATCH_SIZE):
+        yield food_ids[start:start + BATCH_SIZE], recipe_ids[start:start + BATCH_SIZE]
+
+
+def dependent_recipe_ids(food_ids=(), recipe_ids=()):
+    """Ids of the recipes using any of the foods/recipes, directly or through sub-recipes."""
+    found = set()
+    for batch_foods, batch_recipes in _pairs(list(food_ids), list(recipe_ids)):
+        base = select(RecipeIngredient.recipe_id).where(or_(
+            RecipeIngredient.food_id.in_(batch_foods),
+            RecipeIngredient.sub_recipe_id.in_(batch_recipes)
+        )).cte('dependents', recursive=True)
+        # UNION (not UNION ALL) de-duplicates, which also ends the walk on a cycle
+        walk = base.union(
+            select(RecipeIngredient.recipe_id).where(RecipeIngredient.sub_recipe_id == base.c.recipe_id)
+        )
+        found.update(db.session.execute(select(walk.c.recipe_id)).scalars())
+    return found
+
+
+def would_cycle(recipe_id, sub_recipe_ids):
+    """True when making recipe_id use sub_recipe_ids would close a cycle."""
+    sub_recipe_ids = set(sub_recipe_ids)
+    if recipe_id is None or not sub_recipe_ids:
+        return False
+    return recipe_id in sub_recipe_ids or bool(sub_recipe_ids & dependent_recipe_ids(recipe_ids=[recipe_id]))
+
+
+def _load(recipe_ids):
+    ingredients = defaultdict(list)
+    for batch in _batched(recipe_ids):
+        for row in db.session.execute(select(
+            RecipeIngredient.recipe_id,
+            RecipeIngredient.food_id,
+            RecipeIngredient.sub_recipe_id,
+            RecipeIngredient.quantity,
+            RecipeIngredient.amount
+        ).where(RecipeIngredient.recipe_id.in_(batch)).order_by(RecipeIngredient.id)):
+            if row.food_id is not None:
+                ingredients[row.recipe_id].append((FOOD, row.food_id, row.amount or 0))
+            else:
+                ingredients[row.recipe_id].append((RECIPE, row.sub_recipe_id, row.quantity))
+
+    food_ids = {source_id for items in ingredients.values() for kind, source_id, scale in items if kind == FOOD}
+    sub_ids = {source_id for items in ingredients.values() for kind, source_id, scale in items if kind == RECIPE}
+    foods = {}
+    for batch in _batched(food_ids):
+        for row in db.session.execute(select(
+            Food.id, Food.version, Food.serving_size, *(getattr(Food, name) for name in NUTRIENTS)
+        ).where(Food.id.in_(batch))):
+            foods[row.id] = nutrients.per_gram(row).values
+
+    recipes = {}
+    for batch in _batched(set(recipe_ids) | sub_ids):
+        for row in db.session.execute(select(
+            Recipe.id, Recipe.name, Recipe.servings, *(getattr(Recipe, name) for name in NUTRIENTS)
+        ).where(Recipe.id.in_(batch))):
+            recipes[row.id] = row
+    return ingredients, foods, recipes
+
+
+def recompute(recipe_ids):
+    """Re-derive the given recipes (those with ingredient items); returns {id: values} of those that changed."""
+    ingredients, foods, recipes = _load(recipe_ids)
+    derived = [recipe_id for recipe_id in recipe_ids if recipe_id in ingredients]
+    known = {
+        recipe_id: tuple(getattr(row, name) for name in NUTRIENTS)
+        for recipe_id, row in recipes.items() if recipe_id not in ingredients
+    }
+    servings = {recipe_id: row.servings for recipe_id, row in recipes.items()}
+    values = rollup(topological_order(derived, ingredients), ingredients, servings, foods, known)
+
+    changed = {}
+    for recipe_id, new in values.items():
+        row = recipes[recipe_id]
+        if any(abs(getattr(row, name) - value) > TOLERANCE * max(1, abs(value)) for name, value in zip(NUTRIENTS, new)):
+            changed[recipe_id] = {'id': recipe_id, 'name': row.name, **dict(zip(NUTRIENTS, new))}
+    for batch in _batched(changed):
+        db.session.execute(update(Recipe), [
+            {key: value for key, value in changed[recipe_id].items() if key != 'name'} for recipe_id in batch
+        ])
+    return changed
+
+
+def propagate(food_ids=(), recipe_ids=()):
+    """Carry nutrient changes of foods/recipes (or of a recipe's items) up the graph and into meals.
+
+    Returns (changed_recipes, meal_days): {recipe_id: {'name', nutrients...}}
+    for recipes whose derived values moved, and the meal days whose totals
+    changed, for cache invalidation after the caller commits.
+    """
+    targets = set(recipe_ids) | dependent_recipe_ids(food_ids, recipe_ids)
+    changed = recompute(sorted(targets)) if targets else {}
+
+    meal_days = set()
+    if food_ids:
+        meal_days |= meal_totals.source_changed(MealItem.food_id, *food_ids)
+    if recipe_ids or changed:
+        meal_days |= meal_totals.source_changed(MealItem.recipe_id, *(set(recipe_ids) | set(changed)))
+    return changed, meal_days
@@ -0,0 +1,249 @@
+import hashlib
+import json
+import threading
+import time
+from collections import defaultdict
+from flask import current_app
+from app.services import http_cache
+from app.services.cache import LRUCache
+
+# Cache for the rollup-based analytics responses, keyed by
+# (user, endpoint, first day, last day). Past days rarely change, so entries
+# live until their TTL unless a meal/glucose write lands on a day inside their
+# range; the write routes report those days through invalidate().
+#
+# invalidate() only reaches the worker that handled the write, so entries of
+# the per-process store also carry the user's meals/recipes/glucose
+# ResourceVersion counters in their key: a write in any worker changes them
+# and every worker's older entries stop matching.
+#
+# ANALYTICS_CACHE_BACKEND selects the store:
+#   'memory' (default) - per-process TTL/LRU, keys versioned as above
+#   'redis'            - shared across workers, ANALYTICS_CACHE_URL
+#   'none'             - disabled
+
+DEFAULT_TTL = 3600
+DEFAULT_SIZE = 5000
+KEY_PREFIX = 'analytics'
+RESOURCES = ('meals', 'recipes', 'glucose')  # what the analytics responses are computed from
+
+
+class MemoryBackend:
+    """In-process TTL/LRU store with a per-user index of its keys."""
+
+    shared = False
+
+    def __init__(self, capacity=DEFAULT_SIZE):
+        self.entries = LRUCache(capacity)
+        self.index = defaultdict(set)  # str(user_id) -> keys, identities may be int or str
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self.entries.delete(key)
+            return None
+        return value
+
+    def set(self, user_id, key, value, ttl):
+        self.entries.set(key, (time.monotonic() + ttl, value))
+        with self.lock:
+            self.index[str(user_id)].add(key)
+
+    def keys_for(self, user_id):
+        with self.lock:
+            keys = self.index.get(str(user_id), set())
+            # Drop keys the LRU has already evicted
+            keys.intersection_update(self.entries.data)
+            return list(keys)
+
+    def delete(self, user_id, keys):
+        for key in keys:
+            self.entries.delete(key)
+        with self.lock:
+            self.index.get(str(user_id), set()).difference_update(keys)
+
+
+class RedisBackend:
+    """Shared store on any client with the redis-py get/set/delete/sadd/smembers/srem API."""
+
+    shared = True
+
+    def __init__(self, client):
+        self.client = client
+
+    @staticmethod
+    def _index_key(user_id):
+        return f'{KEY_PREFIX}-index:{user_id}'
+
+    def get(self, key):
+        raw = self.client.get(key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, user_id, key, value, ttl):
+        self.client.set(key, json.dumps(value), ex=ttl)
+        self.client.sadd(self._index_key(user_id), key)
+        self.client.expire(self._index_key(user_id), ttl)
+
+    def keys_for(self, user_id):
+        return [key.decode() if isinstance(key, bytes) else key for key in self.client.smembers(self._index_key(user_id))]
+
+    def delete(self, user_id, keys):
+        if keys:
+            self.client.delete(*keys)
+            self.client.srem(self._index_key(user_id), *keys)
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for a redis client (tests, local runs)."""
+
+    def __init__(self):
+        self.values = {}
+        self.sets = defaultdict(set)
+        self.expiry = {}
+        self.lock = threading.Lock()
+
+    def _alive(self, key):
+        expires_at = self.expiry.get(key)
+        if expires_at is not None and expires_at < time.monotonic():
+            self.values.pop(key, None)
+            self.sets.pop(key, None)
+            self.expiry.pop(key, None)
+            return False
+        return key in self.values or key in self.sets
+
+    def get(self, key):
+        with self.lock:
+            return self.values.get(key) if self._alive(key) else None
+
+    def set(self, key, value, ex=None):
+        with self.lock:
+            self.values[key] = value.encode() if isinstance(value, str) else value
+            if ex is None:
+                self.expiry.pop(key, None)
+            else:
+                self.expiry[key] = time.monotonic() + ex
+        return True
+
+    def delete(self, *keys):
+        with self.lock:
+            removed = 0
+            for key in keys:
+                if self._alive(key):
+                    removed += 1
+                self.values.pop(key, None)
+                self.sets.pop(key, None)
+                self.expiry.pop(key, None)
+            return removed
+
+    def expire(self, key, seconds):
+        with self.lock:
+            if not self._alive(key):
+                return False
+            self.expiry[key] = time.monotonic() + seconds
+            return True
+
+    def sadd(self, key, *members):
+        with self.lock:
+            self._alive(key)
+            before = len(self.sets[key])
+            self.sets[key].update(member.encode() for member in members)
+            return len(self.sets[key]) - before
+
+    def smembers(self, key):
+        with self.lock:
+            return set(self.sets[key]) if self._alive(key) else set()
+
+    def srem(self, key, *members):
+        with self.lock:
+            if not self._alive(key):
+                return 0
+            before = len(self.sets[key])
+            self.sets[key].difference_update(member.encode() for member in members)
+            return before - len(self.sets[key])
+
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def _create_backend(config):
+    kind = config.get('ANALYTICS_CACHE_BACKEND', 'memory')
+    if kind == 'none':
+        return None
+    if kind == 'memory':
+        return MemoryBackend(config.get('ANALYTICS_CACHE_SIZE', DEFAULT_SIZE))
+    if kind == 'redis':
+        url = config.get('ANALYTICS_CACHE_URL')
+        if url == 'fake://':
+            return RedisBackend(FakeRedis())
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("ANALYTICS_CACHE_BACKEND='redis' requires the redis package")
+        return RedisBackend(redis.Redis.from_url(url or 'redis://localhost:6379/0'))
+    raise RuntimeError(f"Unknown ANALYTICS_CACHE_BACKEND {kind!r}")
+
+
+def backend():
+    """The configured backend for the current app (None when disabled)."""
+    app = current_app._get_current_object()
+    with _backends_lock:
+        if app not in _backends:
+            _backends[app] = _create_backend(app.config)
+        return _backends[app]
+
+
+def cache_key(user_id, endpoint, start_day, end_day, params=None, versions=None):
+    digest = hashlib.sha1(json.dumps([params or {}, versions], sort_keys=True).encode()).hexdigest()[:12]
+    return f'{KEY_PREFIX}:{user_id}:{endpoint}:{start_day.isoformat()}:{end_day.isoformat()}:{digest}'
+
+
+def _key_range(key):
+    _, start, end, _ = key.rsplit(':', 3)
+    return start, end
+
+
+def cached(user_id, endpoint, start_day, end_day, compute, params=None):
+    """Return compute() for this (user, endpoint, range), reusing a cached result.
+
+    The result must be JSON-serializable and is shared between requests, so
+    callers must not mutate it.
+    """
+    store = backend()
+    if store is None:
+        return compute()
+
+    versions = None
+    if not store.shared:
+        current = http_cache.current_versions(user_id, RESOURCES)
+        versions = {resource: current.get(resource, (0, None))[0] for resource in RESOURCES}
+    key = cache_key(user_id, endpoint, start_day, end_day, params, versions)
+    value = store.get(key)
+    if value is None:
+        value = compute()
+        store.set(user_id, key, value, current_app.config.get('ANALYTICS_CACHE_TTL', DEFAULT_TTL))
+    return value
+
+
+def _drop(user_id, overlaps):
+    store = backend()
+    if store is None:
+        return
+    stale = [key for key in store.keys_for(user_id) if overlaps(*_key_range(key))]
+    store.delete(user_id, stale)
+
+
+def invalidate(user_id, *days):
+    """Drop the user's entries whose range contains any of `days`; call after committing."""
+    wanted = {day.isoformat() for day in days}
+    _drop(user_id, lambda start, end: any(start <= day <= end for day in wanted))
+
+
+def invalidate_span(user_id, first_day, last_day):
+    """Drop the user's entries overlapping first_day..last_day (bulk writes)."""
+    first, last = first_day.isoformat(), last_day.isoformat()
+    _drop(user_id, lambda start, end: start <= last and first <= end)
@@ -0,0 +1,202 @@
+from datetime import datetime, time, timedelta
+from sqlalchemy import func, insert
+from app.models import db, DailyRollup, GlucoseReading
+from app.services import aggregation
+
+# Rollups hold one row per (user, day) so the analytics routes read a handful of
+# rows instead of every meal and reading in the window. Every write route that
+# touches a meal or a glucose reading must report the change here.
+
+NUTRIENTS = ('calories', 'carbs', 'proteins', 'fats')
+
+
+def day_bounds(day):
+    start = datetime.combine(day, time.min)
+    return start, start + timedelta(days=1)
+
+
+def meal_entry(meal):
+    """Snapshot of what a meal contributes to its day, taken before an update."""
+    return meal.user_id, meal.timestamp.date(), meal.totals()
+
+
+def glucose_entry(reading):
+    """Snapshot of what a reading contributes to its day, taken before an update."""
+    return reading.user_id, reading.timestamp.date(), reading.value
+
+
+def _rollup_for(user_id, day):
+    rollup = DailyRollup.query.filter_by(user_id=user_id, day=day).with_for_update().first()
+    if rollup is None:
+        rollup = DailyRollup(
+            user_id=user_id,
+            day=day,
+            calories=0,
+            carbs=0,
+            proteins=0,
+            fats=0,
+            meals_count=0,
+            glucose_count=0,
+            glucose_sum=0
+        )
+        db.session.add(rollup)
+    return rollup
+
+
+def _apply_meal(entry, sign):
+    user_id, day, totals = entry
+    rollup = _rollup_for(user_id, day)
+    rollup.meals_count += sign
+    for name in NUTRIENTS:
+        setattr(rollup, name, getattr(rollup, name) + sign * totals[name])
+    if rollup.meals_count <= 0:
+        # Avoid carrying float drift on days that no longer have meals
+        rollup.meals_count = 0
+        for name in NUTRIENTS:
+            setattr(rollup, name, 0)
+
+
+def _refresh_glucose_bounds(rollup):
+    start, end = day_bounds(rollup.day)
+    low, high = db.session.query(
+        func.min(GlucoseReading.value),
+        func.max(GlucoseReading.value)
+    ).filter(
+        GlucoseReading.user_id == rollup.user_id,
+        GlucoseReading.timestamp >= start,
+        GlucoseReading.timestamp < end
+    ).one()
+    rollup.glucose_min = low
+    rollup.glucose_max = high
+
+
+def _apply_glucose(entry, sign):
+    user_id, day, value = entry
+    rollup = _rollup_for(user_id, day)
+    rollup.glucose_count += sign
+    rollup.glucose_sum += sign * value
+
+    if sign > 0:
+        rollup.glucose_min = value if rollup.glucose_min is None else min(rollup.glucose_min, value)
+        rollup.glucose_max = value if rollup.glucose_max is None else max(rollup.glucose_max, value)
+    elif rollup.glucose_count <= 0:
+        rollup.glucose_count = 0
+        rollup.glucose_sum = 0
+        rollup.glucose_min = None
+        rollup.glucose_max = None
+    elif rollup.glucose_min is None or value <= rollup.glucose_min or value >= rollup.glucose_max:
+        # Removing an extreme value: only this one day has to be rescanned
+        _refresh_glucose_bounds(rollup)
+
+
+# Write hooks, called by the routes before they commit. Removals and updates
+# must be reported after the session has been changed (deleted / mutated) so a
+# bounds refresh sees the new state.
+def meal_added(meal):
+    _apply_meal(meal_entry(meal), 1)
+
+
+def meal_removed(meal):
+    _apply_meal(meal_entry(meal), -1)
+
+
+def meal_changed(before, meal):
+    _apply_meal(before, -1)
+    _apply_meal(meal_entry(meal), 1)
+
+
+def meal_totals_shifted(user_id, day, delta):
+    # A meal's stored totals were recomputed (services/meal_totals.py)
+    rollup = _rollup_for(user_id, day)
+    for name in NUTRIENTS:
+        setattr(rollup, name, getattr(rollup, name) + delta[name])
+
+
+def glucose_added(reading):
+    _apply_glucose(glucose_entry(reading), 1)
+
+
+def glucose_removed(reading):
+    _apply_glucose(glucose_entry(reading), -1)
+
+
+def glucose_changed(before, reading):
+    _apply_glucose(before, -1)
+    _apply_glucose(glucose_entry(reading), 1)
+
+
+def meal_batch_added(user_id, entries):
+    """Fold bulk-inserted meals, given as (day, totals) pairs, into the rollups, one update per day."""
+    days = {}
+    for day, totals in entries:
+        count, sums = days.get(day, (0, dict.fromkeys(NUTRIENTS, 0)))
+        for name in NUTRIENTS:
+            sums[name] += totals[name]
+        days[day] = (count + 1, sums)
+
+    for day, (count, sums) in days.items():
+        rollup = _rollup_for(user_id, day)
+        rollup.meals_count += count
+        for name in NUTRIENTS:
+            setattr(rollup, name, getattr(rollup, name) + sums[name])
+
+
+def glucose_batch_added(user_id, rows):
+    """Fold a bulk insert (list of column dicts) into the rollups, one update per day."""
+    days = {}
+    for row in rows:
+        day = row['timestamp'].date()
+        count, total, low, high = days.get(day, (0, 0, row['value'], row['value']))
+        days[day] = (count + 1, total + row['value'], min(low, row['value']), max(high, row['value']))
+
+    for day, (count, total, low, high) in days.items():
+        rollup = _rollup_for(user_id, day)
+        rollup.glucose_count += count
+        rollup.glucose_sum += total
+        rollup.glucose_min = low if rollup.glucose_min is None else min(rollup.glucose_min, low)
+        rollup.glucose_max = high if rollup.glucose_max is None else max(rollup.glucose_max, high)
+
+
+# Maintenance
+def rebuild(user_id, start_day=None, end_day=None):
+    """Recompute a user's rollups from the source rows (backfill / repair)."""
+    stale = DailyRollup.query.filter(DailyRollup.user_id == user_id)
+    if start_day:
+        stale = stale.filter(DailyRollup.day >= start_day)
+    if end_day:
+        stale = stale.filter(DailyRollup.day <= end_day)
+    stale.delete()
+
+    rows = {}
+
+    def row_for(period):
+        day = aggregation.as_date(period)
+        if day not in rows:
+            rows[day] = {
+                'user_id': user_id,
+                'day': day,
+                'calories': 0,
+                'carbs': 0,
+                'proteins': 0,
+                'fats': 0,
+                'meals_count': 0,
+                'glucose_count': 0,
+                'glucose_sum': 0,
+                'glucose_min': None,
+                'glucose_max': None
+            }
+        return rows[day]
+
+    for meal_row in aggregation.meal_series(user_id, start_day, end_day):
+        row = row_for(meal_row['period'])
+        row['meals_count'] = meal_row['meals_count']
+        for name in NUTRIENTS:
+            row[name] = meal_row[name]
+
+    for glucose_row in aggregation.glucose_series(user_id, start_day, end_day):
+        row = row_for(glucose_row['period'])
+        for name in ('glucose_count', 'glucose_sum', 'glucose_min', 'glucose_max'):
+            row[name] = glucose_row[name]
+
+    if rows:
+        db.session.execute(insert(DailyRollup), list(rows.values()))
@@ -0,0 +1,189 @@
+import re
+import threading
+from bisect import bisect_left, insort
+from collections import defaultdict
+from sqlalchemy import func, literal_column, or_, select
+from app.models import db, Food, Meal, Recipe
+from app.services import http_cache
+
+# Ranked search over food, recipe and meal names.
+#
+# On PostgreSQL this uses the GIN indexes declared on the models: a 'simple'
+# tsvector for (prefix) word matches and pg_trgm word similarity for typo
+# tolerance. On other databases (SQLite locally) a per-user in-process n-gram
+# index is built on first use and patched by the write routes. As with the
+# autocomplete index, each one remembers the ResourceVersion of its kind: a
+# search compares it with the current version and rebuilds when another worker
+# has written since, and a patch only advances it over its own request's bump.
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+MIN_SIMILARITY = 0.6  # same as pg_trgm's default word_similarity_threshold
+
+KINDS = {
+    'foods': Food,
+    'recipes': Recipe,
+    'meals': Meal
+}
+
+
+def tokenize(text):
+    return re.findall(r'\w+', (text or '').lower())
+
+
+def trigrams(text):
+    grams = set()
+    for word in tokenize(text):
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class NGramIndex:
+    """Trigram inverted index plus a sorted word list for prefix lookups."""
+
+    def __init__(self, version=0):
+        self.version = version  # ResourceVersion.version of the kind the docs reflect
+        self.docs = {}  # key -> trigram set
+        self.postings = defaultdict(set)  # trigram -> keys
+        self.words = []  # sorted (word, key)
+
+    def add(self, key, name):
+        self.remove(key)
+        grams = trigrams(name)
+        self.docs[key] = grams
+        for gram in grams:
+            self.postings[gram].add(key)
+        for word in set(tokenize(name)):
+            insort(self.words, (word, key))
+
+    def remove(self, key):
+        grams = self.docs.pop(key, None)
+        if grams is None:
+            return
+        for gram in grams:
+            self.postings[gram].discard(key)
+        self.words = [entry for entry in self.words if entry[1] != key]
+
+    def prefix_matches(self, prefix):
+        matches = set()
+        index = bisect_left(self.words, (prefix,))
+        while index < len(self.words) and self.words[index][0].startswith(prefix):
+            matches.add(self.words[index][1])
+            index += 1
+        return matches
+
+    def search(self, query, limit):
+        """Return [(score, key)] best first: prefix hits on every query word rank
+        highest, then trigram word similarity (share of the query's trigrams
+        found in the name, as in pg_trgm's word_similarity)."""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        prefix_hits = set.intersection(*(self.prefix_matches(token) for token in tokens))
+        query_grams = trigrams(query)
+        shared = defaultdict(int)
+        for gram in query_grams:
+            for key in self.postings.get(gram, ()):
+                shared[key] += 1
+
+        scored = []
+        for key in prefix_hits | set(shared):
+            similarity = shared[key] / len(query_grams) if query_grams else 0
+            if key in prefix_hits:
+                scored.append((1 + similarity, key))
+            elif similarity >= MIN_SIMILARITY:
+                scored.append((similarity, key))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return scored[:limit]
+
+
+_indexes = {}
+_lock = threading.Lock()
+
+
+def _index_for(user_id, kind):
+    # Read before building, see autocomplete.complete()
+    version = http_cache.current_versions(user_id, [kind]).get(kind, (0, None))[0]
+    with _lock:
+        index = _indexes.get((user_id, kind))
+        if index is None or index.version != version:
+            model = KINDS[kind]
+            index = NGramIndex(version)
+            rows = db.session.execute(select(model.id, model.name).where(model.user_id == user_id))
+            for row_id, name in rows:
+                index.add(row_id, name)
+            _indexes[(user_id, kind)] = index
+        return index
+
+
+def _patchable(user_id, kind, index):
+    """Advance the index's version over this request's bump; False if it missed another write."""
+    bumped = http_cache.bumped_version(user_id, kind)
+    if bumped is None:
+        return True
+    # Equal when an earlier patch of this request already advanced it
+    if bumped not in (index.version, index.version + 1):
+        return False
+    index.version = bumped
+    return True
+
+
+def document_changed(kind, user_id, row_id, name):
+    """Keep an already-built fallback index current after a committed create or update."""
+    with _lock:
+        index = _indexes.get((user_id, kind))
+        if index is None:
+            return
+        if _patchable(user_id, kind, index):
+            index.add(row_id, name)
+        else:
+            del _indexes[(user_id, kind)]
+
+
+def document_removed(kind, user_id, row_id):
+    with _lock:
+        index = _indexes.get((user_id, kind))
+        if index is None:
+            return
+        if _patchable(user_id, kind, index):
+            index.remove(row_id)
+        else:
+            del _indexes[(user_id, kind)]
+
+
+def _postgres_ranked_ids(model, user_id, query, limit):
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+    config = literal_column("'simple'")
+    document = func.to_tsvector(config, model.name)
+    ts_query = func.to_tsquery(config, ' & '.join(f'{token}:*' for token in tokens))
+    rank = func.greatest(func.ts_rank(document, ts_query), func.word_similarity(query, model.name))
+
+    # name %> query: the query is close to some word in the name (GIN trigram index)
+    stmt = select(model.id).where(
+        model.user_id == user_id,
+        or_(document.op('@@')(ts_query), model.name.op('%>')(query))
+    ).order_by(rank.desc(), model.id).limit(limit)
+    return list(db.session.execute(stmt).scalars())
+
+
+def ranked_ids(kind, user_id, query, limit):
+    if db.session.get_bind().dialect.name == 'postgresql':
+        return _postgres_ranked_ids(KINDS[kind], user_id, query, limit)
+    return [key for _, key in _index_for(user_id, kind).search(query, limit)]
+
+
+def search(user_id, query, limit=DEFAULT_LIMIT):
+    """Top `limit` matches per kind, best first."""
+    results = {}
+    for kind, model in KINDS.items():
+        ids = ranked_ids(kind, user_id, query, limit)
+        rows = model.query.filter(model.id.in_(ids))
+        if model is Meal:
+            rows = rows.options(Meal.eager_items())
+        by_id = {row.id: row for row in rows} if ids else {}
+        results[kind] = [by_id[row_id].to_dict() for row_id in ids if row_id in by_id]
+    return results
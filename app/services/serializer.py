@@ -0,0 +1,221 @@
+import json
+from functools import lru_cache
+from itertools import islice
+from flask import Response, current_app
+from sqlalchemy import select
+from app.models import db, Food, GlucoseReading, Meal, MealItem, Recipe
+from app.models.nutrients import NUTRIENTS
+from app.services import profiling
+
+# Serialization for the big list endpoints. Rows are fetched as plain column
+# tuples (no ORM instances, identity map or relationship loading), datetimes
+# are formatted through a small cache (batch-inserted rows share
+# created_at/updated_at values), and the encoder is chosen by the JSON_BACKEND
+# config value: 'stdlib' (default) or 'orjson' when it is installed.
+
+DATETIME_CACHE_SIZE = 65536
+ITEM_BATCH_SIZE = 500
+
+
+@lru_cache(maxsize=DATETIME_CACHE_SIZE)
+def _format_datetime(value):
+    return value.isoformat()
+
+
+def format_datetime(value):
+    return _format_datetime(value) if value is not None else None
+
+
+def _stdlib_dumps(payload):
+    return json.dumps(payload, separators=(',', ':'))
+
+
+def _json_backend(name):
+    if name == 'stdlib':
+        return _stdlib_dumps
+    if name == 'orjson':
+        try:
+            import orjson
+        except ImportError:
+            raise RuntimeError("JSON_BACKEND='orjson' requires the orjson package")
+        return orjson.dumps
+    raise RuntimeError(f"Unknown JSON_BACKEND {name!r}")
+
+
+def dumps(payload):
+    """Encode with the configured backend (str for stdlib, bytes for orjson)."""
+    with profiling.serializing():
+        return _json_backend(current_app.config.get('JSON_BACKEND', 'stdlib'))(payload)
+
+
+def json_response(payload, status=200):
+    return Response(dumps(payload), status=status, mimetype='application/json')
+
+
+class Projection:
+    """Column-level view of a model that serializes rows like its to_dict()."""
+
+    def __init__(self, fields):
+        self.keys = tuple(fields)
+        self.columns = tuple(fields.values())
+        self.datetime_keys = tuple(
+            key for key, column in fields.items() if isinstance(column.type, db.DateTime)
+        )
+
+    def select(self, query):
+        """Narrow an ORM query on the model to just the projected columns."""
+        return query.with_entities(*self.columns)
+
+    def row_dict(self, row):
+        data = dict(zip(self.keys, row))
+        for key in self.datetime_keys:
+            data[key] = format_datetime(data[key])
+        return data
+
+    def serialize(self, rows):
+        with profiling.serializing():
+            return [self.row_dict(row) for row in rows]
+
+
+GLUCOSE = Projection({
+    'id': GlucoseReading.id,
+    'value': GlucoseReading.value,
+    'timestamp': GlucoseReading.timestamp,
+    'notes': GlucoseReading.notes,
+    'user_id': GlucoseReading.user_id,
+    'meal_id': GlucoseReading.meal_id,
+    'created_at': GlucoseReading.created_at,
+    'updated_at': GlucoseReading.updated_at
+})
+
+RECIPE = Projection({
+    'id': Recipe.id,
+    'name': Recipe.name,
+    'description': Recipe.description,
+    'ingredients': Recipe.ingredients,
+    'instructions': Recipe.instructions,
+    'serving_size': Recipe.serving_size,
+    'serving_unit': Recipe.serving_unit,
+    'servings': Recipe.servings,
+    'calories': Recipe.calories,
+    'carbs': Recipe.carbs,
+    'proteins': Recipe.proteins,
+    'fats': Recipe.fats,
+    'is_public': Recipe.is_public,
+    'user_id': Recipe.user_id,
+    'created_at': Recipe.created_at,
+    'updated_at': Recipe.updated_at
+})
+
+FOOD = Projection({
+    'id': Food.id,
+    'name': Food.name,
+    'description': Food.description,
+    'serving_size': Food.serving_size,
+    'serving_unit': Food.serving_unit,
+    'calories': Food.calories,
+    'carbs': Food.carbs,
+    'proteins': Food.proteins,
+    'fats': Food.fats,
+    'user_id': Food.user_id,
+    'created_at': Food.created_at,
+    'updated_at': Food.updated_at
+})
+
+
+class MealProjection(Projection):
+    """Meals plus their items, recipes and foods, loaded with one extra query per batch."""
+
+    ITEM = Projection({
+        'id': MealItem.id,
+        'quantity': MealItem.quantity,
+        'amount': MealItem.amount,
+        'created_at': MealItem.created_at,
+        'updated_at': MealItem.updated_at
+    })
+
+    @staticmethod
+    def _source(projection, cache, values):
+        if values[0] is None:
+            return None
+        found = cache.get(values[0])
+        if found is None:
+            found = cache[values[0]] = projection.row_dict(values)
+        return found
+
+    def _items_by_meal(self, meal_ids):
+        stmt = select(MealItem.meal_id, *self.ITEM.columns, *RECIPE.columns, *FOOD.columns).outerjoin(
+            Recipe, MealItem.recipe_id == Recipe.id
+        ).outerjoin(
+            Food, MealItem.food_id == Food.id
+        ).where(MealItem.meal_id.in_(meal_ids)).order_by(MealItem.id)
+
+        recipe_at = 1 + len(self.ITEM.columns)
+        food_at = recipe_at + len(RECIPE.columns)
+        recipes = {}
+        foods = {}
+        per_gram = {}
+        zero = dict.fromkeys(NUTRIENTS, 0)
+        items = {meal_id: [] for meal_id in meal_ids}
+        for row in db.session.execute(stmt):
+            item = self.ITEM.row_dict(row[1:recipe_at])
+            recipe = self._source(RECIPE, recipes, row[recipe_at:food_at])
+            food = self._source(FOOD, foods, row[food_at:])
+            if recipe is not None:
+                source, scale = recipe, item['quantity']
+            elif food is not None:
+                if food['id'] not in per_gram:
+                    # Same arithmetic as app/models/nutrients.py
+                    per_gram[food['id']] = {name: food[name] / (food['serving_size'] or 1) for name in NUTRIENTS}
+                source, scale = per_gram[food['id']], item['amount'] or 0
+            else:
+                source, scale = zero, 0
+            items[row[0]].append({
+                'id': item['id'],
+                'quantity': item['quantity'],
+                'amount': item['amount'],
+                'recipe': recipe,
+                'food': food,
+                'calories_total': source['calories'] * scale,
+                'carbs_total': source['carbs'] * scale,
+                'proteins_total': source['proteins'] * scale,
+                'fats_total': source['fats'] * scale,
+                'created_at': item['created_at'],
+                'updated_at': item['updated_at']
+            })
+        return items
+
+    def serialize(self, rows):
+        # The item queries run inside; serializing() leaves their time to the db figure
+        with profiling.serializing():
+            meals = [self.row_dict(row) for row in rows]
+            for start in range(0, len(meals), ITEM_BATCH_SIZE):
+                batch = meals[start:start + ITEM_BATCH_SIZE]
+                items = self._items_by_meal([meal['id'] for meal in batch])
+                for meal in batch:
+                    meal['meal_items'] = items[meal['id']]
+            return meals
+
+
+MEAL = MealProjection({
+    'id': Meal.id,
+    'name': Meal.name,
+    'timestamp': Meal.timestamp,
+    'notes': Meal.notes,
+    'total_calories': Meal.calories,
+    'total_carbs': Meal.carbs,
+    'total_proteins': Meal.proteins,
+    'total_fats': Meal.fats,
+    'user_id': Meal.user_id,
+    'created_at': Meal.created_at,
+    'updated_at': Meal.updated_at
+})
+
+
+def iter_batches(rows, size):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
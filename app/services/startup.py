@@ -0,0 +1,134 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from prometheus_client import Gauge
+
+# Cold-start accounting. The app package notes when it began importing
+# (app.STARTED); create_app() and app/app.py wrap each component's import and
+# init in step(), and the first response served records the
+# time-to-first-response, warning when it is over STARTUP_TARGET_SECONDS.
+# With STARTUP_PROFILE=True the steps are logged once the app is built.
+#
+# Nothing here touches the database: the schema is migrated to the latest
+# Alembic revision by `flask preflight`, run once per deploy before the workers
+# start, not by the first request.
+
+logger = logging.getLogger('app.startup')
+
+MIGRATIONS_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'migrations'))
+
+STARTUP_STEP_SECONDS = Gauge('app_startup_step_seconds', 'Time spent importing/initializing each startup component', ['step'])
+FIRST_RESPONSE_SECONDS = Gauge('app_time_to_first_response_seconds', 'Time from the app package being imported to its first response')
+
+steps = []
+_first_response = threading.Lock()
+_first_response_seen = False
+
+
+@contextmanager
+def step(name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - started)
+
+
+def record(name, seconds):
+    steps.append((name, seconds))
+    STARTUP_STEP_SECONDS.labels(name).set(seconds)
+
+
+def running_cli():
+    """True when the app is being loaded by the `flask` command rather than a server."""
+    return click.get_current_context(silent=True) is not None
+
+
+def elapsed():
+    from app import STARTED
+    return time.perf_counter() - STARTED
+
+
+def report(app):
+    """Log the startup steps (STARTUP_PROFILE) once the app is built."""
+    if not app.config.get('STARTUP_PROFILE'):
+        return
+    lines = [f"  {name:32} {seconds * 1000:8.1f} ms" for name, seconds in steps]
+    logger.warning(
+        "startup profile, %.1f ms since import:\n%s", elapsed() * 1000, '\n'.join(lines)
+    )
+
+
+def _first_response_hook(response):
+    global _first_response_seen
+    if _first_response_seen:
+        return response
+    with _first_response:
+        if _first_response_seen:
+            return response
+        _first_response_seen = True
+    seconds = elapsed()
+    FIRST_RESPONSE_SECONDS.set(seconds)
+    target = current_app.config.get('STARTUP_TARGET_SECONDS')
+    if target and seconds > target:
+        logger.warning("first response %.3fs after import, over the %.3fs target", seconds, target)
+    else:
+        logger.info("first response %.3fs after import", seconds)
+    return response
+
+
+def init_app(app):
+    app.after_request(_first_response_hook)
+    app.cli.add_command(preflight_command)
+
+
+def _revision(db):
+    from alembic.migration import MigrationContext
+    with db.engine.connect() as connection:
+        return MigrationContext.configure(connection).get_current_revision()
+
+
+def preflight():
+    """Check the database connection and upgrade the schema to head; returns [(step, seconds, detail)]."""
+    from flask_migrate import Migrate, upgrade
+    from sqlalchemy import inspect, text
+    from app.models import db
+    timings = []
+
+    started = time.perf_counter()
+    db.session.execute(text('SELECT 1'))
+    db.session.remove()
+    timings.append(('connect', time.perf_counter() - started, db.engine.url.render_as_string(hide_password=True)))
+
+    started = time.perf_counter()
+    before = _revision(db)
+    if before is None and inspect(db.engine).get_table_names():
+        # Tables from db.create_all() but no alembic_version: upgrading would
+        # try to create them again
+        raise RuntimeError(
+            "The database has tables but no migration revision; "
+            "run `flask db stamp <revision>` for the schema it has, then preflight again"
+        )
+    if 'migrate' not in current_app.extensions:
+        Migrate(current_app, db, directory=MIGRATIONS_DIR)
+    upgrade()
+    after = _revision(db)
+    timings.append(('migrate', time.perf_counter() - started, f"{before or 'empty'} -> {after}" if before != after else f"at {after}"))
+    return timings
+
+
+@click.command('preflight')
+@with_appcontext
+def preflight_command():
+    """Connect to the database and migrate it to the latest revision (run before starting workers)."""
+    try:
+        timings = preflight()
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
+    for name, seconds, detail in timings:
+        click.echo(f"{name:14} {seconds * 1000:8.1f} ms  {detail}")
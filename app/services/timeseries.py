@@ -0,0 +1,181 @@
+import sys
+from array import array
+from datetime import datetime, time, timedelta
+from sqlalchemy import delete, select
+from app.models import db, GlucoseChunk, GlucoseReading
+
+# Chart reads use GlucoseChunk: one row per user-day holding that day's
+# readings as two packed arrays. glucose_readings stays the source of truth;
+# a day's chunk is rebuilt from it whenever a reading on that day changes.
+
+EPOCH = datetime(1970, 1, 1)
+DEFAULT_POINTS = 300
+MAX_POINTS = 5000
+
+
+def _pack(typecode, items):
+    packed = array(typecode, items)
+    if sys.byteorder == 'big':
+        packed.byteswap()  # stored little-endian
+    return packed.tobytes()
+
+
+def _unpack(typecode, blob):
+    packed = array(typecode)
+    packed.frombytes(blob)
+    if sys.byteorder == 'big':
+        packed.byteswap()
+    return packed
+
+
+def epoch_seconds(moment):
+    return int((moment - EPOCH).total_seconds())
+
+
+def refresh_days(user_id, days):
+    """Rebuild the chunks of the given days from glucose_readings (caller commits)."""
+    for day in set(days):
+        start = datetime.combine(day, time.min)
+        rows = db.session.execute(
+            select(GlucoseReading.timestamp, GlucoseReading.value).where(
+                GlucoseReading.user_id == user_id,
+                GlucoseReading.timestamp >= start,
+                GlucoseReading.timestamp < start + timedelta(days=1)
+            ).order_by(GlucoseReading.timestamp)
+        ).all()
+
+        chunk = db.session.get(GlucoseChunk, (user_id, day))
+        if not rows:
+            if chunk is not None:
+                db.session.delete(chunk)
+            continue
+        if chunk is None:
+            chunk = GlucoseChunk(user_id=user_id, day=day)
+            db.session.add(chunk)
+        chunk.count = len(rows)
+        chunk.offsets = _pack('I', (int((ts - start).total_seconds()) for ts, _ in rows))
+        chunk.values = _pack('f', (value for _, value in rows))
+
+
+def rebuild(user_id):
+    """Re-pack every day of a user's readings (backfill / repair)."""
+    db.session.execute(delete(GlucoseChunk).where(GlucoseChunk.user_id == user_id))
+    days = db.session.execute(
+        select(GlucoseReading.timestamp).where(GlucoseReading.user_id == user_id)
+    ).scalars()
+    refresh_days(user_id, {timestamp.date() for timestamp in days})
+
+
+def load_chunks(user_id, start, end):
+    """(day, day_start_epoch_seconds, offsets_blob, values_blob) for the days overlapping [start, end]."""
+    chunks = db.session.execute(
+        select(GlucoseChunk.day, GlucoseChunk.offsets, GlucoseChunk.values).where(
+            GlucoseChunk.user_id == user_id,
+            GlucoseChunk.day >= start.date(),
+            GlucoseChunk.day <= end.date()
+        ).order_by(GlucoseChunk.day)
+    ).all()
+    return [
+        (day, epoch_seconds(datetime.combine(day, time.min)), offsets, packed_values)
+        for day, offsets, packed_values in chunks
+    ]
+
+
+def load_series(user_id, start, end):
+    """Return (epoch_seconds, values) arrays for readings in [start, end], ascending."""
+    low, high = epoch_seconds(start), epoch_seconds(end)
+    times, values = array('q'), array('d')
+    for day, base, offsets, packed_values in load_chunks(user_id, start, end):
+        for offset, value in zip(_unpack('I', offsets), _unpack('f', packed_values)):
+            moment = base + offset
+            if low <= moment <= high:
+                times.append(moment)
+                values.append(value)
+    return times, values
+
+
+def bucket_stats(times, values, bucket_minutes):
+    """min/max/avg per fixed-width bucket, aligned to the first reading."""
+    if not times:
+        return []
+    width = bucket_minutes * 60
+    origin = times[0] - times[0] % width
+    buckets = {}
+    for moment, value in zip(times, values):
+        key = (moment - origin) // width
+        stats = buckets.get(key)
+        if stats is None:
+            buckets[key] = [1, value, value, value]
+        else:
+            stats[0] += 1
+            stats[1] += value
+            if value < stats[2]:
+                stats[2] = value
+            if value > stats[3]:
+                stats[3] = value
+
+    return [
+        {
+            "t": (EPOCH + timedelta(seconds=origin + key * width)).isoformat(),
+            "avg": total / count,
+            "min": low,
+            "max": high,
+            "count": count
+        }
+        for key, (count, total, low, high) in sorted(buckets.items())
+    ]
+
+
+def lttb(times, values, threshold):
+    """Largest-Triangle-Three-Buckets: keep the `threshold` points that best preserve the curve's shape."""
+    n = len(times)
+    if threshold >= n or threshold < 3:
+        return list(zip(times, values))
+
+    sampled = [(times[0], values[0])]
+    every = (n - 2) / (threshold - 2)
+    anchor = 0
+    for i in range(threshold - 2):
+        # Average of the next bucket is the third corner of the triangle
+        avg_start = int((i + 1) * every) + 1
+        avg_end = min(int((i + 2) * every) + 1, n)
+        avg_count = avg_end - avg_start
+        avg_t = sum(times[avg_start:avg_end]) / avg_count
+        avg_v = sum(values[avg_start:avg_end]) / avg_count
+
+        anchor_t, anchor_v = times[anchor], values[anchor]
+        best, best_area = int(i * every) + 1, -1
+        for j in range(int(i * every) + 1, int((i + 1) * every) + 1):
+            area = abs((anchor_t - avg_t) * (values[j] - anchor_v) - (anchor_t - times[j]) * (avg_v - anchor_v))
+            if area > best_area:
+                best, best_area = j, area
+        sampled.append((times[best], values[best]))
+        anchor = best
+
+    sampled.append((times[-1], values[-1]))
+    return sampled
+
+
+def chart(user_id, start, end, mode='lttb', points=DEFAULT_POINTS, bucket_minutes=None):
+    """Downsampled series for [start, end], roughly `points` long."""
+    times, values = load_series(user_id, start, end)
+    points = min(max(points, 3), MAX_POINTS)
+
+    if mode == 'buckets':
+        if not bucket_minutes:
+            span_minutes = (end - start).total_seconds() / 60
+            bucket_minutes = max(int(span_minutes // points), 1)
+        series = bucket_stats(times, values, bucket_minutes)
+    else:
+        series = [
+            {"t": (EPOCH + timedelta(seconds=moment)).isoformat(), "value": value}
+            for moment, value in lttb(times, values, points)
+        ]
+
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "mode": mode,
+        "readings_count": len(times),
+        "points": series
+    }
@@ -0,0 +1,166 @@
+"""Load a running server with N concurrent clients and report latency/throughput.
+
+    python benchmarks/concurrency.py --url http://localhost:5000 \\
+        --email bench@example.com --password bench [--clients 100,500,1000] [--duration 20]
+
+Run it once per worker profile against the same database, e.g.
+
+    GUNICORN_WORKER_CLASS=sync   gunicorn -c gunicorn.conf.py app.app:app
+    GUNICORN_WORKER_CLASS=gevent gunicorn -c gunicorn.conf.py app.app:app
+
+Each client keeps one HTTP/1.1 connection open and cycles through the
+read-heavy endpoints (meals, glucose, analytics). The user is registered on
+first use; seed it with data beforehand for realistic payloads (datagen.py,
+then --email bench1@example.com --password bench). --output writes the
+numbers per level as JSON (see results.py); --compare checks p95 against an
+earlier file and exits 1 on a regression beyond --threshold.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from datetime import date, timedelta
+from urllib.parse import urlsplit
+
+import results
+
+
+def login(base_url, email, password):
+    def post(path, payload):
+        req = urllib.request.Request(
+            base_url + path,
+            data=json.dumps(payload).encode(),
+            headers={'Content-Type': 'application/json'}
+        )
+        with urllib.request.urlopen(req) as response:
+            return json.load(response)
+
+    try:
+        return post('/api/login', {'email': email, 'password': password})['access_token']
+    except urllib.error.HTTPError:
+        post('/api/register', {'email': email, 'password': password, 'name': 'bench'})
+        return post('/api/login', {'email': email, 'password': password})['access_token']
+
+
+def endpoints():
+    today = date.today()
+    month_ago = today - timedelta(days=30)
+    return [
+        '/api/meals?limit=50',
+        '/api/glucose?limit=50',
+        f'/api/analytics/daily?date={today.isoformat()}',
+        f'/api/analytics/range?start_date={month_ago.isoformat()}&end_date={today.isoformat()}'
+    ]
+
+
+async def client(host, port, token, paths, deadline, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    i = 0
+    try:
+        while time.perf_counter() < deadline:
+            path = paths[i % len(paths)]
+            i += 1
+            started = time.perf_counter()
+            writer.write(
+                f"GET {path} HTTP/1.1\r\nHost: {host}\r\nAuthorization: Bearer {token}\r\n\r\n".encode()
+            )
+            await writer.drain()
+            status_line = await reader.readline()
+            if not status_line:
+                # Server closed the keep-alive connection (max_requests etc.)
+                writer.close()
+                reader, writer = await asyncio.open_connection(host, port)
+                continue
+            length = 0
+            closing = False
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                if name.lower() == 'content-length':
+                    length = int(value)
+                elif name.lower() == 'connection' and value.strip().lower() == 'close':
+                    closing = True
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - started)
+            if int(status_line.split()[1]) >= 400:
+                errors.append(status_line.decode().strip())
+            if closing:
+                writer.close()
+                reader, writer = await asyncio.open_connection(host, port)
+    except (OSError, asyncio.IncompleteReadError) as e:
+        errors.append(type(e).__name__)
+    finally:
+        writer.close()
+
+
+async def run(host, port, token, clients, duration):
+    latencies = []
+    errors = []
+    paths = endpoints()
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(*(
+        client(host, port, token, paths[i % len(paths):] + paths[:i % len(paths)], deadline, latencies, errors)
+        for i in range(clients)
+    ))
+    return latencies, errors
+
+
+def percentile(values, p):
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://localhost:5000')
+    parser.add_argument('--email', default='bench@example.com')
+    parser.add_argument('--password', default='bench')
+    parser.add_argument('--clients', default='100,500,1000')
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--output')
+    parser.add_argument('--compare')
+    parser.add_argument('--threshold', type=float, default=0.2)
+    args = parser.parse_args()
+
+    url = urlsplit(args.url)
+    token = login(args.url, args.email, args.password)
+    print(f"{args.url}, {args.duration:g}s per level")
+    print(f"  {'clients':>7} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    report = {}
+    for clients in (int(n) for n in args.clients.split(',')):
+        latencies, errors = asyncio.run(run(url.hostname, url.port or 80, token, clients, args.duration))
+        latencies.sort()
+        report[f'clients={clients}'] = {
+            **results.summarize(latencies),
+            'requests_per_second': len(latencies) / args.duration,
+            'errors': len(errors)
+        }
+        if not latencies:
+            print(f"  {clients:>7} no successful requests ({len(errors)} errors)")
+            continue
+        print(
+            f"  {clients:>7} {len(latencies) / args.duration:9.1f}"
+            f" {statistics.median(latencies) * 1000:9.1f}"
+            f" {percentile(latencies, 0.95) * 1000:9.1f}"
+            f" {percentile(latencies, 0.99) * 1000:9.1f}"
+            f" {len(errors):>7}"
+        )
+        for error, count in Counter(errors).most_common(3):
+            print(f"          {count} x {error}")
+
+    config = {'url': args.url, 'email': args.email, 'duration': args.duration, 'paths': endpoints()}
+    if args.output:
+        results.write(args.output, 'concurrency', config, report)
+        print(f"wrote {args.output}")
+    if args.compare and results.compare(args.compare, report, threshold=args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+"""Per-endpoint latency of app/app.py through the Flask test client.
+
+    python benchmarks/endpoints.py [--database-url sqlite:///bench.db] [--email bench1@example.com] \\
+        [--requests 50] [--warmup 5] [--output results.json] [--compare baseline.json] [--threshold 0.2]
+
+Without --database-url a temporary SQLite database is filled by datagen.py
+first (its volume options, e.g. --years 1 --glucose-per-day 288, apply).
+Each case is requested --warmup times, then --requests times; the report and
+the --output file hold latency percentiles, requests/s (one client, no
+network) and, from the Server-Timing header (services/profiling.py), the
+median SQL statement count, DB time and serialization time per request. The
+analytics cache is off unless --analytics-cache is given, so repeated
+requests do the real work. With --compare the exit status is 1 when any
+case's p95 regressed by more than --threshold. For throughput over HTTP with
+many clients, see concurrency.py.
+"""
+import argparse
+import os
+import re
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import datagen
+import results
+
+SERVER_TIMING = re.compile(r'(\w+);dur=([\d.]+)(?:;desc="(\d+) queries)?')
+
+
+def read_cases(last_day):
+    day = last_day.isoformat()
+    month_ago = (last_day - timedelta(days=30)).isoformat()
+    year_ago = (last_day - timedelta(days=365)).isoformat()
+    return [
+        ('user', '/api/user'),
+        ('foods', '/api/foods'),
+        ('recipes', '/api/recipes'),
+        ('meals page', '/api/meals?limit=50'),
+        ('meals month', f'/api/meals?start_date={month_ago}&end_date={day}T23:59:59&limit=500'),
+        ('glucose page', '/api/glucose?limit=50'),
+        ('glucose day', f'/api/glucose?start_date={day}&end_date={day}T23:59:59&limit=500'),
+        ('glucose chart 90d', f'/api/glucose?chart=lttb&end_date={day}T23:59:59'),
+        ('analytics daily', f'/api/analytics/daily?date={day}'),
+        ('analytics weekly', '/api/analytics/weekly'),
+        ('analytics monthly', f'/api/analytics/monthly?year={last_day.year}&month={last_day.month}'),
+        ('analytics range year', f'/api/analytics/range?start_date={year_ago}&end_date={day}&bucket=week'),
+        ('analytics glycemic', f'/api/analytics/glycemic?start_date={month_ago}&end_date={day}'),
+        ('analytics postprandial', f'/api/analytics/postprandial?start_date={month_ago}&end_date={day}'),
+        ('search', '/api/search?q=chicken'),
+        ('autocomplete', '/api/autocomplete?q=sal')
+    ]
+
+
+def write_cases(last_day, food_id):
+    moment = datetime.combine(last_day + timedelta(days=1), datetime.min.time())
+    counter = iter(range(10 ** 9))
+
+    def meal():
+        return {'name': 'Bench meal', 'timestamp': (moment + timedelta(seconds=next(counter))).isoformat(),
+                'items': [{'food_id': food_id, 'amount': 150}]}
+
+    def reading():
+        return {'value': 110, 'timestamp': (moment + timedelta(seconds=next(counter))).isoformat()}
+
+    return [('create meal', '/api/meals', meal), ('create glucose', '/api/glucose', reading)]
+
+
+def measure(client, headers, send, warmup, repeat):
+    for _ in range(warmup):
+        send(client, headers)
+    latencies, statements, db_ms, serialize_ms, statuses = [], [], [], [], set()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        request_started = time.perf_counter()
+        response = send(client, headers)
+        latencies.append(time.perf_counter() - request_started)
+        statuses.add(response.status_code)
+        timing = {name: (float(dur), count) for name, dur, count in SERVER_TIMING.findall(response.headers.get('Server-Timing', ''))}
+        if 'db' in timing:
+            db_ms.append(timing['db'][0])
+            statements.append(int(timing['db'][1]))
+        if 'ser' in timing:
+            serialize_ms.append(timing['ser'][0])
+    elapsed = time.perf_counter() - started
+
+    stats = results.summarize(latencies)
+    stats['requests_per_second'] = repeat / elapsed if elapsed else None
+    stats['statuses'] = sorted(statuses)
+    stats['sql_statements'] = statistics.median(statements) if statements else None
+    stats['db_ms'] = statistics.median(db_ms) if db_ms else None
+    stats['serialize_ms'] = statistics.median(serialize_ms) if serialize_ms else None
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database-url')
+    parser.add_argument('--email', default='bench1@example.com')
+    parser.add_argument('--requests', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--analytics-cache', action='store_true')
+    parser.add_argument('--no-writes', action='store_true')
+    parser.add_argument('--output')
+    parser.add_argument('--compare')
+    parser.add_argument('--threshold', type=float, default=0.2)
+    datagen.add_arguments(parser)
+    args = parser.parse_args()
+
+    database_url = args.database_url
+    if database_url is None:
+        database_url = 'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='bench-'), 'bench.db')
+    app = datagen.create_app(database_url)
+    app.config['ANALYTICS_CACHE_BACKEND'] = 'memory' if args.analytics_cache else 'none'
+    app.config['PROFILING_SERVER_TIMING'] = 'always'
+
+    from app.models import db, Food, Meal, User
+    with app.app_context():
+        if args.database_url is None:
+            print(f"Generating into {database_url}")
+            datagen.generate(args)
+        user = User.query.filter_by(email=args.email).first()
+        if user is None:
+            parser.error(f"{args.email} not found; run datagen.py against {database_url} first")
+        last_day = db.session.query(db.func.max(Meal.timestamp)).filter(Meal.user_id == user.id).scalar().date()
+        food_id = db.session.query(db.func.min(Food.id)).filter(Food.user_id == user.id).scalar()
+
+    client = app.test_client()
+    login = client.post('/api/login', json={'email': args.email, 'password': datagen.PASSWORD})
+    if login.status_code != 200:
+        parser.error(f"login failed ({login.status_code}): {login.get_data(as_text=True)}")
+    headers = {'Authorization': 'Bearer ' + login.get_json()['access_token']}
+
+    cases = [(name, lambda c, h, path=path: c.get(path, headers=h)) for name, path in read_cases(last_day)]
+    if not args.no_writes:
+        cases += [
+            (name, lambda c, h, path=path, body=body: c.post(path, json=body(), headers=h))
+            for name, path, body in write_cases(last_day, food_id)
+        ]
+
+    print(f"{database_url}, {args.email}, {args.requests} requests per case after {args.warmup} warmup")
+    print(f"  {'case':24} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>8} {'sql':>5} {'db ms':>8} {'ser ms':>8}  status")
+    report = {}
+    for name, send in cases:
+        stats = measure(client, headers, send, args.warmup, args.requests)
+        report[name] = stats
+        print(
+            f"  {name:24} {stats['p50_ms']:9.2f} {stats['p95_ms']:9.2f} {stats['p99_ms']:9.2f}"
+            f" {stats['requests_per_second']:8.1f}"
+            f" {stats['sql_statements'] if stats['sql_statements'] is not None else '-':>5}"
+            f" {stats['db_ms'] if stats['db_ms'] is not None else float('nan'):8.2f}"
+            f" {stats['serialize_ms'] if stats['serialize_ms'] is not None else float('nan'):8.2f}"
+            f"  {','.join(map(str, stats['statuses']))}"
+        )
+
+    config = {
+        'database': database_url.split(':', 1)[0],
+        'email': args.email,
+        'requests': args.requests,
+        'warmup': args.warmup,
+        'analytics_cache': args.analytics_cache,
+        'data': datagen.volumes(args) if args.database_url is None else None
+    }
+    if args.output:
+        results.write(args.output, 'endpoints', config, report)
+        print(f"wrote {args.output}")
+    if args.compare and results.compare(args.compare, report, threshold=args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+"""Full vs incremental recipe nutrient rollup on a synthetic recipe graph.
+
+    python benchmarks/recipe_graph.py [--nodes 50000] [--foods 10000] [--repeat 5] [--no-db]
+
+Builds a random DAG (each recipe uses 2-6 foods or earlier recipes), then
+times services/recipe_graph.py: the full topological rollup, the incremental
+recompute after one food changes, and cycle detection. Unless --no-db is
+given the same graph is loaded into an in-memory SQLite database and the
+database path (recursive dependents query + recompute) is timed as well;
+recipes whose values move by less than recipe_graph.TOLERANCE are recomputed
+there but not written.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.services import recipe_graph
+from app.services.recipe_graph import FOOD, RECIPE
+
+
+def build_graph(recipes, foods, seed=7):
+    rng = random.Random(seed)
+    food_values = {
+        food_id: (rng.uniform(0, 9), rng.uniform(0, 0.8), rng.uniform(0, 0.4), rng.uniform(0, 0.5))
+        for food_id in range(1, foods + 1)
+    }
+    ingredients = {}
+    servings = {}
+    for recipe_id in range(1, recipes + 1):
+        items = []
+        for _ in range(rng.randint(2, 6)):
+            # Mostly foods; sub-recipes come from a window of recent recipes so
+            # the graph gets deep chains as well as wide fan-in
+            if recipe_id > 1 and rng.random() < 0.3:
+                items.append((RECIPE, rng.randint(max(1, recipe_id - 2000), recipe_id - 1), rng.choice((0.5, 1, 2))))
+            else:
+                items.append((FOOD, rng.randint(1, foods), rng.uniform(10, 300)))
+        ingredients[recipe_id] = items
+        servings[recipe_id] = rng.choice((1, 2, 4))
+    return ingredients, servings, food_values
+
+
+def users_index(ingredients):
+    users_of = defaultdict(list)
+    for recipe_id, items in ingredients.items():
+        for kind, source_id, scale in items:
+            users_of[(kind, source_id)].append(recipe_id)
+    return users_of
+
+
+def measure(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), result
+
+
+def in_memory(args, ingredients, servings, foods):
+    recipe_ids = list(ingredients)
+    users_of = users_index(ingredients)
+
+    def full():
+        return recipe_graph.rollup(recipe_graph.topological_order(recipe_ids, ingredients), ingredients, servings, foods, {})
+
+    full_ms, values = measure(full, args.repeat)
+
+    # The food with the most direct users: the worst single-food change
+    changed_food = max(range(1, args.foods + 1), key=lambda food_id: len(users_of.get((FOOD, food_id), ())))
+    foods = dict(foods)
+    foods[changed_food] = tuple(value * 1.1 for value in foods[changed_food])
+
+    def incremental():
+        affected = recipe_graph.dependents(users_of, [(FOOD, changed_food)])
+        known = {recipe_id: value for recipe_id, value in values.items() if recipe_id not in affected}
+        order = recipe_graph.topological_order(affected, ingredients)
+        return recipe_graph.rollup(order, ingredients, servings, foods, known)
+
+    incremental_ms, updated = measure(incremental, args.repeat)
+    expected = recipe_graph.rollup(recipe_graph.topological_order(recipe_ids, ingredients), ingredients, servings, foods, {})
+    matches = all(
+        all(abs(a - b) <= 1e-9 * max(1, abs(b)) for a, b in zip(updated.get(recipe_id, value), expected[recipe_id]))
+        for recipe_id, value in values.items()
+    )
+
+    # Close a cycle: some recipe's sub-recipe starts using that recipe
+    user, sub_recipe = next(
+        (recipe_id, source_id) for recipe_id, items in ingredients.items()
+        for kind, source_id, scale in items if kind == RECIPE
+    )
+    cyclic = dict(ingredients)
+    cyclic[sub_recipe] = ingredients[sub_recipe] + [(RECIPE, user, 1)]
+
+    def detect():
+        try:
+            recipe_graph.topological_order(recipe_ids, cyclic)
+        except recipe_graph.CycleError as e:
+            return e.cycle
+        return None
+
+    cycle_ms, cycle = measure(detect, args.repeat)
+
+    print(f"{len(recipe_ids) + args.foods} nodes ({len(recipe_ids)} recipes, {args.foods} foods), median of {args.repeat} runs (ms)")
+    print(f"  full rollup                 {full_ms:9.1f}  {len(recipe_ids)} recipes")
+    print(f"  incremental (food {changed_food:>5})     {incremental_ms:9.1f}  {len(updated)} recipes recomputed, matches full: {matches}")
+    print(f"  cycle detection             {cycle_ms:9.1f}  " + (f"cycle of {len(cycle) - 1} recipes" if cycle else "no cycle found"))
+    return changed_food
+
+
+def in_database(args, ingredients, servings, foods, changed_food):
+    from datetime import datetime
+    from flask import Flask
+    from sqlalchemy import insert, update
+    from app.models import db, User, Food, Recipe, RecipeIngredient
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        user = User(username='bench', email='bench@example.com', password_hash='x')
+        db.session.add(user)
+        db.session.flush()
+        now = datetime.utcnow()
+        db.session.execute(insert(Food), [{
+            'id': food_id, 'name': f'Food {food_id}', 'serving_size': 1, 'version': 1,
+            'calories': values[0], 'carbs': values[1], 'proteins': values[2], 'fats': values[3],
+            'user_id': user.id, 'created_at': now, 'updated_at': now
+        } for food_id, values in foods.items()])
+        db.session.execute(insert(Recipe), [{
+            'id': recipe_id, 'name': f'Recipe {recipe_id}', 'servings': servings[recipe_id],
+            'calories': 0, 'carbs': 0, 'proteins': 0, 'fats': 0,
+            'user_id': user.id, 'created_at': now, 'updated_at': now
+        } for recipe_id in ingredients])
+        db.session.execute(insert(RecipeIngredient), [{
+            'recipe_id': recipe_id,
+            'food_id': source_id if kind == FOOD else None,
+            'sub_recipe_id': source_id if kind == RECIPE else None,
+            'amount': scale if kind == FOOD else None,
+            'quantity': scale if kind == RECIPE else 1
+        } for recipe_id, items in ingredients.items() for kind, source_id, scale in items])
+        db.session.commit()
+
+        started = time.perf_counter()
+        changed = recipe_graph.recompute(list(ingredients))
+        db.session.commit()
+        full_ms = (time.perf_counter() - started) * 1000
+
+        db.session.execute(update(Food).where(Food.id == changed_food).values(
+            calories=Food.calories * 1.1, version=Food.version + 1
+        ))
+        dependents = recipe_graph.dependent_recipe_ids(food_ids=[changed_food])
+        started = time.perf_counter()
+        changed_recipes, meal_days = recipe_graph.propagate(food_ids=[changed_food])
+        db.session.commit()
+        incremental_ms = (time.perf_counter() - started) * 1000
+
+        print("  SQLite, single run (ms)")
+        print(f"    full recompute            {full_ms:9.1f}  {len(changed)} recipes written")
+        print(f"    propagate(food {changed_food:>5})    {incremental_ms:9.1f}  {len(dependents)} recipes recomputed, {len(changed_recipes)} written")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--nodes', type=int, default=50000)
+    parser.add_argument('--foods', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--no-db', action='store_true')
+    args = parser.parse_args()
+
+    ingredients, servings, foods = build_graph(args.nodes - args.foods, args.foods)
+    changed_food = in_memory(args, ingredients, servings, foods)
+    if not args.no_db:
+        in_database(args, ingredients, servings, foods, changed_food)
+
+
+if __name__ == '__main__':
+    main()
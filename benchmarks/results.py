@@ -0,0 +1,89 @@
+"""Machine-readable benchmark results, shared by endpoints.py and concurrency.py.
+
+A results file is JSON:
+
+    {"benchmark": "endpoints", "environment": {"commit": ..., "dirty": ..., ...},
+     "config": {...}, "results": {"<case>": {"p50_ms": ..., "p95_ms": ..., ...}}}
+
+compare() lines a run up against an earlier file (e.g. from the parent
+commit) and reports the cases whose metric got worse by more than the
+threshold.
+"""
+import json
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+ROOT = __file__.rsplit('/benchmarks/', 1)[0]
+
+
+def _git(*args):
+    try:
+        return subprocess.run(('git',) + args, cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    status = _git('status', '--porcelain', '--untracked-files=no')
+    return {
+        'commit': _git('rev-parse', 'HEAD'),
+        'dirty': bool(status) if status is not None else None,
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'recorded_at': datetime.now(timezone.utc).isoformat(timespec='seconds')
+    }
+
+
+def summarize(latencies):
+    """Latency stats (ms) for a list of durations in seconds."""
+    ordered = sorted(latencies)
+    if not ordered:
+        return {'count': 0}
+
+    def percentile(p):
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p))] * 1000
+
+    return {
+        'count': len(ordered),
+        'mean_ms': sum(ordered) / len(ordered) * 1000,
+        'min_ms': ordered[0] * 1000,
+        'p50_ms': percentile(0.5),
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99),
+        'max_ms': ordered[-1] * 1000
+    }
+
+
+def write(path, benchmark, config, results):
+    with open(path, 'w') as f:
+        json.dump({
+            'benchmark': benchmark,
+            'environment': environment(),
+            'config': config,
+            'results': results
+        }, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def compare(baseline_path, results, metric='p95_ms', threshold=0.2):
+    """Print metric changes against a baseline file; returns the regressed case names."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"vs {baseline_path} ({(baseline['environment'].get('commit') or 'unknown')[:12]}), {metric}")
+
+    regressions = []
+    for case, stats in results.items():
+        before = baseline['results'].get(case, {}).get(metric)
+        after = stats.get(metric)
+        if before is None or after is None:
+            print(f"  {case:32} {'-' if before is None else f'{before:.2f}':>9} -> {'-' if after is None else f'{after:.2f}':>9}  (not comparable)")
+            continue
+        change = (after - before) / before if before else 0
+        flag = ''
+        if change > threshold:
+            regressions.append(case)
+            flag = '  REGRESSION'
+        print(f"  {case:32} {before:9.2f} -> {after:9.2f}  {change:+7.1%}{flag}")
+    return regressions
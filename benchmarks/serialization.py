@@ -0,0 +1,129 @@
+"""Compare list serialization paths on synthetic data.
+
+    python benchmarks/serialization.py [--rows 10000] [--repeat 5]
+
+Runs against an in-memory SQLite database, so it measures fetch + serialize +
+encode cost without network time. "orm" is the original path (ORM instances,
+to_dict(), jsonify); "projection" is services/serializer.py with each JSON
+backend.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from flask import Flask, jsonify
+from sqlalchemy import insert
+from app.models import db, User, Recipe, Meal, MealItem, GlucoseReading
+from app.services import serializer
+
+
+def create_app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+
+def populate(rows):
+    user = User(username='bench', email='bench@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.flush()
+
+    now = datetime.utcnow()
+    start = now - timedelta(minutes=5 * rows)
+    db.session.execute(insert(Recipe), [{
+        'name': f'Recipe {i}',
+        'serving_size': 100,
+        'calories': random.randint(50, 800),
+        'carbs': random.uniform(0, 80),
+        'proteins': random.uniform(0, 40),
+        'fats': random.uniform(0, 30),
+        'user_id': user.id,
+        'created_at': now,
+        'updated_at': now
+    } for i in range(50)])
+    db.session.execute(insert(GlucoseReading), [{
+        'value': random.uniform(70, 180),
+        'timestamp': start + timedelta(minutes=5 * i),
+        'user_id': user.id,
+        'created_at': now,
+        'updated_at': now
+    } for i in range(rows)])
+    db.session.execute(insert(Meal), [{
+        'name': f'Meal {i}',
+        'timestamp': start + timedelta(minutes=5 * i),
+        'user_id': user.id,
+        'created_at': now,
+        'updated_at': now
+    } for i in range(rows)])
+    db.session.execute(insert(MealItem), [{
+        'meal_id': meal_id,
+        'recipe_id': random.randint(1, 50),
+        'quantity': random.choice((0.5, 1, 1.5, 2)),
+        'created_at': now,
+        'updated_at': now
+    } for meal_id in range(1, rows + 1) for _ in range(2)])
+    db.session.commit()
+    return user.id
+
+
+def measure(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        db.session.expunge_all()
+        serializer._format_datetime.cache_clear()
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        user_id = populate(args.rows)
+
+        cases = {
+            'glucose': (GlucoseReading, GlucoseReading.query.filter_by(user_id=user_id), serializer.GLUCOSE),
+            'meals': (Meal, Meal.query.filter_by(user_id=user_id), serializer.MEAL)
+        }
+        print(f"{args.rows} rows, median of {args.repeat} runs (ms)")
+        for name, (model, query, projection) in cases.items():
+            ordered = query.order_by(model.timestamp.desc(), model.id.desc())
+            if model is Meal:
+                orm_query = ordered.options(Meal.eager_items())
+            else:
+                orm_query = ordered
+
+            with app.test_request_context():
+                results = {'orm': measure(lambda: jsonify([row.to_dict() for row in orm_query.all()]).get_data(), args.repeat)}
+                for backend in ('stdlib', 'orjson'):
+                    app.config['JSON_BACKEND'] = backend
+                    try:
+                        results[f'projection/{backend}'] = measure(
+                            lambda: serializer.json_response(projection.serialize(projection.select(ordered).all())).get_data(),
+                            args.repeat
+                        )
+                    except RuntimeError as e:
+                        print(f"  skipping {backend}: {e}")
+
+            baseline = results['orm']
+            for label, elapsed in results.items():
+                print(f"  {name:8} {label:20} {elapsed:9.1f}  x{baseline / elapsed:.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""Cold-start time: fresh interpreter to first response.
+
+    python benchmarks/startup.py [--target run:app] [--path /api/health] [--runs 7] \\
+        [--target-ms 1000] [--output results.json] [--compare baseline.json]
+
+Each run starts a new Python process that imports the app (run:app is what
+gunicorn serves; app.app:app also works, e.g. with --path /api/user) and
+sends one request through the test client. Reported per run: process spawn
+to app ready, and to first response, plus the median of each startup step
+from services/startup.py. Exits 1 when the median time-to-first-response is
+over --target-ms (default STARTUP_TARGET_SECONDS) or, with --compare,
+regressed by more than --threshold. Run `flask preflight` first if the path
+touches the database.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import results
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+CHILD = """
+import importlib, json, sys, time
+module, attr = sys.argv[1].split(':')
+app = getattr(importlib.import_module(module), attr)
+ready = time.time()
+status = app.test_client().get(sys.argv[2]).status_code
+first_response = time.time()
+from app.services import startup
+print(json.dumps({'ready': ready, 'first_response': first_response, 'status': status, 'steps': startup.steps}))
+"""
+
+
+def cold_start(target, path):
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    spawned = time.time()
+    output = subprocess.run(
+        [sys.executable, '-c', CHILD, target, path], cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    if output.returncode:
+        raise SystemExit(f"{target} failed to start:\n{output.stderr}")
+    run = json.loads(output.stdout.strip().splitlines()[-1])
+    run['ready'] -= spawned
+    run['first_response'] -= spawned
+    return run
+
+
+def main():
+    from app.config import Config
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--target', default='run:app')
+    parser.add_argument('--path', default='/api/health')
+    parser.add_argument('--runs', type=int, default=7)
+    parser.add_argument('--target-ms', type=float, default=Config.STARTUP_TARGET_SECONDS * 1000)
+    parser.add_argument('--output')
+    parser.add_argument('--compare')
+    parser.add_argument('--threshold', type=float, default=0.2)
+    args = parser.parse_args()
+
+    runs = [cold_start(args.target, args.path) for _ in range(args.runs)]
+    steps = defaultdict(list)
+    for run in runs:
+        for name, seconds in run['steps']:
+            steps[name].append(seconds * 1000)
+
+    ready = results.summarize([run['ready'] for run in runs])
+    first = results.summarize([run['first_response'] for run in runs])
+    print(f"{args.target} GET {args.path} (status {runs[0]['status']}), {args.runs} cold starts")
+    print(f"  {'':24} {'p50 ms':>9} {'min ms':>9} {'max ms':>9}")
+    print(f"  {'spawn to app ready':24} {ready['p50_ms']:9.1f} {ready['min_ms']:9.1f} {ready['max_ms']:9.1f}")
+    print(f"  {'spawn to first response':24} {first['p50_ms']:9.1f} {first['min_ms']:9.1f} {first['max_ms']:9.1f}")
+    print("  startup steps (median ms)")
+    for name, timings in steps.items():
+        print(f"    {name:32} {statistics.median(timings):8.1f}")
+
+    met = first['p50_ms'] <= args.target_ms
+    print(f"target {args.target_ms:.0f} ms: {'met' if met else 'MISSED'}")
+
+    report = {
+        'app ready': ready,
+        'first response': first,
+        **{f'step {name}': {'p50_ms': statistics.median(timings)} for name, timings in steps.items()}
+    }
+    if args.output:
+        results.write(args.output, 'startup', {'target': args.target, 'path': args.path, 'target_ms': args.target_ms}, report)
+        print(f"wrote {args.output}")
+    # Steps are reported for reading, only the end-to-end numbers gate
+    headline = {name: report[name] for name in ('app ready', 'first response')}
+    regressed = args.compare and results.compare(args.compare, headline, metric='p50_ms', threshold=args.threshold)
+    if not met or regressed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+import multiprocessing
+import os
+
+# Each worker process holds its own SQLAlchemy pool of up to
+# DB_POOL_SIZE + DB_MAX_OVERFLOW connections, so size both together.
+#
+# Worker profiles (GUNICORN_WORKER_CLASS):
+#   sync    one request per worker (or per thread with GUNICORN_THREADS)
+#   gevent  up to GUNICORN_WORKER_CONNECTIONS requests per worker as greenlets;
+#           psycopg2 is made cooperative so a request waiting on Postgres
+#           yields to the others. The pool still caps concurrent queries, the
+#           rest wait up to DB_POOL_TIMEOUT for a connection.
+
+bind = os.environ.get('BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'sync')
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 1000))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = 50
+
+# Open connections after fork, never share a pool between workers
+preload_app = False
+
+
+def on_starting(server):
+    pool = int(os.environ.get('DB_POOL_SIZE', 5)) + int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    limit = int(os.environ.get('DB_MAX_CONNECTIONS', 100))
+    if worker_class == 'sync' and threads > pool:
+        server.log.warning("GUNICORN_THREADS=%s exceeds the per-worker pool of %s connections", threads, pool)
+    if workers * pool > limit:
+        server.log.warning(
+            "%s workers x %s connections = %s exceeds DB_MAX_CONNECTIONS=%s; lower DB_POOL_SIZE/DB_MAX_OVERFLOW or WEB_CONCURRENCY",
+            workers, pool, workers * pool, limit
+        )
+
+
+def post_worker_init(worker):
+    if worker_class == 'gevent':
+        # The gevent worker has already monkey-patched the stdlib by now, but
+        # psycopg2 blocks in C unless it gets a wait callback
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
@@ -0,0 +1,57 @@
+import os
+
+# app/app.py reads DATABASE_URL on import
+os.environ['DATABASE_URL'] = 'sqlite://'
+
+import pytest
+from app.app import app as flask_app
+from app.models import db
+from app.models import nutrients
+from app.services import auth_cache, autocomplete, catalog, response_cache, search
+
+
+def reset_caches():
+    # In-process caches outlive a test's database
+    autocomplete._indexes.clear()
+    search._indexes.clear()
+    response_cache._backends.clear()
+    auth_cache.profiles.clear()
+    catalog.cache.clear()
+    nutrients._vectors.clear()
+
+
+@pytest.fixture
+def app():
+    flask_app.config.update(TESTING=True, MEAL_RESPONSE_LINK_ASYNC=False)
+    reset_caches()
+    with flask_app.app_context():
+        db.create_all()
+        yield flask_app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth_headers(client):
+    client.post('/api/register', json={'email': 'test@example.com', 'password': 'secret', 'name': 'Test'})
+    token = client.post('/api/login', json={'email': 'test@example.com', 'password': 'secret'}).get_json()['access_token']
+    return {'Authorization': 'Bearer ' + token}
+
+
+@pytest.fixture
+def food(client, auth_headers):
+    return client.post('/api/foods', json={
+        'name': 'Apple', 'calories': 52, 'carbs': 14, 'protein': 0.3, 'fat': 0.2
+    }, headers=auth_headers).get_json()
+
+
+@pytest.fixture
+def recipe(client, auth_headers):
+    return client.post('/api/recipes', json={
+        'name': 'Porridge', 'ingredients': 'oats, milk', 'calories': 300, 'carbs': 50, 'protein': 10, 'fat': 6
+    }, headers=auth_headers).get_json()
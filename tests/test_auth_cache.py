@@ -0,0 +1,32 @@
+import time
+from datetime import timedelta
+from flask_jwt_extended import create_access_token
+
+
+def get_user(client, token):
+    return client.get('/api/user', headers={'Authorization': 'Bearer ' + token})
+
+
+def test_cached_token_expires(app, client, auth_headers):
+    user_id = get_user(client, auth_headers['Authorization'].split()[1]).get_json()['id']
+    token = create_access_token(identity=user_id, expires_delta=timedelta(seconds=2))
+    assert get_user(client, token).status_code == 200
+    assert get_user(client, token).status_code == 200
+    assert app.extensions['verified_tokens'].hits >= 1
+
+    time.sleep(2.1)
+
+    # The cached claims lapse at exp and the full decode rejects the token
+    assert get_user(client, token).status_code == 401
+
+
+def test_modified_token_is_verified_again(app, client, auth_headers):
+    token = auth_headers['Authorization'].split()[1]
+    assert get_user(client, token).status_code == 200
+    assert get_user(client, token).status_code == 200
+    assert app.extensions['verified_tokens'].hits >= 1
+
+    # A different token misses the cache and fails signature verification
+    header, payload, signature = token.split('.')
+    tampered = '.'.join([header, payload, signature[:-4] + ('AAAA' if signature[-4:] != 'AAAA' else 'BBBB')])
+    assert get_user(client, tampered).status_code == 422
@@ -0,0 +1,30 @@
+from app.models import db, Food
+from app.services import autocomplete, http_cache
+
+
+def names(client, headers, prefix):
+    return [item['name'] for item in client.get(f'/api/autocomplete?q={prefix}', headers=headers).get_json()]
+
+
+def test_write_in_another_worker_rebuilds_index(client, auth_headers, food):
+    assert names(client, auth_headers, 'ban') == []
+
+    # What another worker's create_food leaves behind: the row and the version
+    # bump, but no patch of this process's index
+    user_id = food['user_id']
+    db.session.add(Food(name='Banana', calories=89, carbs=23, proteins=1.1, fats=0.3, user_id=user_id))
+    http_cache.bump(user_id, 'foods')
+    db.session.commit()
+    db.session.remove()
+
+    assert names(client, auth_headers, 'ban') == ['Banana']
+
+
+def test_own_write_patches_index(client, auth_headers, food):
+    assert names(client, auth_headers, 'app') == ['Apple']
+    index = next(iter(autocomplete._indexes.values()))
+
+    client.put(f"/api/foods/{food['id']}", json={'name': 'Green apple'}, headers=auth_headers)
+
+    assert names(client, auth_headers, 'app') == ['Green apple']
+    assert next(iter(autocomplete._indexes.values())) is index
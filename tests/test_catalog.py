@@ -0,0 +1,29 @@
+from app.models import CatalogFood
+from app.services import catalog
+
+
+def write_csv(path, rows):
+    path.write_text('source_id,name,calories,carbs,proteins,fats\n' + ''.join(f'{row}\n' for row in rows))
+    return str(path)
+
+
+def test_import_counts_only_new_rows(app, tmp_path):
+    path = write_csv(tmp_path / 'foods.csv', ['1,Apple,52,14,0.3,0.2', '2,Pear,57,15,0.4,0.1', '1,Apple,52,14,0.3,0.2', '3,Broken,x,0,0,0'])
+
+    job = catalog.import_file(path, 'test', batch_size=2)
+
+    assert (job.status, job.rows_read, job.rows_inserted, job.rows_skipped) == ('done', 4, 2, 1)
+    assert CatalogFood.query.count() == 2
+
+
+def test_finished_import_is_only_read_again_on_restart(app, tmp_path):
+    path = write_csv(tmp_path / 'foods.csv', ['1,Apple,52,14,0.3,0.2'])
+    catalog.import_file(path, 'test')
+
+    # A newer release under the same file name
+    write_csv(tmp_path / 'foods.csv', ['1,Apple,52,14,0.3,0.2', '2,Pear,57,15,0.4,0.1'])
+    assert catalog.import_file(path, 'test').rows_read == 1
+
+    job = catalog.import_file(path, 'test', restart=True)
+    assert (job.status, job.rows_read, job.rows_inserted) == ('done', 2, 1)
+    assert CatalogFood.query.count() == 2
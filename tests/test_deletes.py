@@ -0,0 +1,22 @@
+def log_meal(client, headers, item):
+    response = client.post('/api/meals', json={'name': 'Lunch', 'timestamp': '2026-01-01T12:00:00', 'items': [item]}, headers=headers)
+    assert response.status_code == 201
+    return response.get_json()
+
+
+def test_food_used_in_meals_is_not_deleted(client, auth_headers, food):
+    meal = log_meal(client, auth_headers, {'food_id': food['id'], 'amount': 100})
+
+    assert client.delete(f"/api/foods/{food['id']}", headers=auth_headers).status_code == 409
+
+    client.delete(f"/api/meals/{meal['id']}", headers=auth_headers)
+    assert client.delete(f"/api/foods/{food['id']}", headers=auth_headers).status_code == 200
+
+
+def test_recipe_used_in_meals_is_not_deleted(client, auth_headers, recipe):
+    meal = log_meal(client, auth_headers, {'recipe_id': recipe['id'], 'quantity': 1})
+
+    assert client.delete(f"/api/recipes/{recipe['id']}", headers=auth_headers).status_code == 409
+
+    client.delete(f"/api/meals/{meal['id']}", headers=auth_headers)
+    assert client.delete(f"/api/recipes/{recipe['id']}", headers=auth_headers).status_code == 200
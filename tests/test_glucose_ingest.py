@@ -0,0 +1,42 @@
+from datetime import datetime
+from app.models import db, GlucoseReading
+from app.services import glucose_ingest
+
+
+def reading_row(user_id, timestamp, value=110):
+    now = datetime.utcnow()
+    return {'user_id': user_id, 'value': value, 'timestamp': timestamp, 'notes': '', 'created_at': now, 'updated_at': now}
+
+
+def test_insert_skips_readings_written_concurrently(client, auth_headers):
+    # A reading another upload wrote after this upload's duplicate check
+    user_id = client.get('/api/user', headers=auth_headers).get_json()['id']
+    taken, free = datetime(2026, 1, 1, 8, 0), datetime(2026, 1, 1, 8, 5)
+    db.session.add(GlucoseReading(user_id=user_id, value=100, timestamp=taken))
+    db.session.commit()
+
+    inserted = glucose_ingest._insert_ignoring_duplicates([reading_row(user_id, taken), reading_row(user_id, free)])
+
+    assert inserted == {free}
+    assert GlucoseReading.query.filter_by(user_id=user_id).count() == 2
+
+
+def test_repeated_upload_reports_duplicates(client, auth_headers):
+    readings = [{'value': 100 + i, 'timestamp': f'2026-01-01T08:{i:02d}:00'} for i in range(5)]
+    first = client.post('/api/glucose/batch', json=readings, headers=auth_headers)
+    second = client.post('/api/glucose/batch', json=readings, headers=auth_headers)
+
+    assert first.get_json()['created'] == 5
+    assert second.status_code == 200
+    assert second.get_json()['created'] == 0
+    assert second.get_json()['duplicates'] == 5
+
+
+def test_reading_at_a_taken_time_conflicts(client, auth_headers):
+    reading = {'value': 100, 'timestamp': '2026-01-01T08:00:00'}
+    assert client.post('/api/glucose', json=reading, headers=auth_headers).status_code == 201
+    assert client.post('/api/glucose', json=reading, headers=auth_headers).status_code == 409
+
+    other = client.post('/api/glucose', json={'value': 120, 'timestamp': '2026-01-01T08:05:00'}, headers=auth_headers)
+    moved = client.put(f"/api/glucose/{other.get_json()['id']}", json={'timestamp': '2026-01-01T08:00:00'}, headers=auth_headers)
+    assert moved.status_code == 409
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from app.services import glycemic
+
+
+def test_summary_known_values():
+    stats = glycemic.summary(np.array([50.0, 100.0, 200.0, 300.0]))
+
+    assert stats['mean'] == 162.5
+    assert stats['sd'] == pytest.approx(96.0143, abs=1e-4)  # population SD
+    assert stats['cv'] == pytest.approx(59.0857, abs=1e-4)
+    assert stats['gmi'] == pytest.approx(7.197)
+    assert stats['time_in_range'] == 25
+    assert stats['time_below_range'] == 25
+    assert stats['time_very_low'] == 25
+    assert stats['time_above_range'] == 50
+    assert stats['time_very_high'] == 25
+
+
+def test_mage_counts_only_excursions_over_one_sd():
+    # The 200 -> 190 -> 200 wiggle is smaller than the SD and is left out
+    assert glycemic.mage(np.array([100.0, 200.0, 190.0, 200.0, 100.0]), sd=50) == 100
+    assert glycemic.mage(np.array([100.0, 100.0, 100.0]), sd=0) == 0
+
+
+def test_incremental_auc_of_a_triangle():
+    times = np.array([0, 3600, 7200], dtype=np.int64)
+    values = np.array([100.0, 160.0, 100.0])
+
+    # 60 mg/dL peak over a 120 minute base
+    assert glycemic.incremental_auc(times, values, 0, minutes=120) == pytest.approx(3600)
+    # Baseline interpolated at the start: 130 mg/dL at 30 min, peak 30 above it for 60 of the 90 min
+    assert glycemic.incremental_auc(times, values, 1800, minutes=90) == pytest.approx(900)
+    # Readings must cover the whole window
+    assert glycemic.incremental_auc(times, values, 3600, minutes=120) is None
+
+
+def test_moving_window_is_not_revalidated(client, auth_headers):
+    response = client.get('/api/analytics/glycemic', headers=auth_headers)
+    assert response.status_code == 200
+    assert 'ETag' not in response.headers
+
+    pinned = '/api/analytics/glycemic?start_date=2026-01-01&end_date=2026-01-15'
+    etag = client.get(pinned, headers=auth_headers).headers['ETag']
+    assert client.get(pinned, headers={**auth_headers, 'If-None-Match': etag}).status_code == 304
@@ -0,0 +1,35 @@
+from datetime import datetime
+from app.models import db, ResourceVersion
+from app.services import http_cache
+
+
+def test_meal_list_etag_changes_with_embedded_food(client, auth_headers, food):
+    client.post('/api/meals', json={
+        'name': 'Snack', 'timestamp': '2026-01-01T10:00:00', 'items': [{'food_id': food['id'], 'amount': 100}]
+    }, headers=auth_headers)
+    first = client.get('/api/meals', headers=auth_headers)
+    etag = first.headers['ETag']
+    assert client.get('/api/meals', headers={**auth_headers, 'If-None-Match': etag}).status_code == 304
+
+    client.put(f"/api/foods/{food['id']}", json={'name': 'Green apple'}, headers=auth_headers)
+
+    second = client.get('/api/meals', headers={**auth_headers, 'If-None-Match': etag})
+    assert second.status_code == 200
+    assert 'Green apple' in second.get_data(as_text=True)
+
+
+def test_bump_upserts_the_version_row(client, auth_headers):
+    user_id = client.get('/api/user', headers=auth_headers).get_json()['id']
+    http_cache.bump(user_id, 'glucose')
+    assert http_cache.bumped_version(user_id, 'glucose') == 1
+
+    # A row another request committed in the meantime is incremented, not re-inserted
+    with db.engine.begin() as connection:
+        connection.execute(ResourceVersion.__table__.update().where(
+            ResourceVersion.user_id == user_id, ResourceVersion.resource == 'glucose'
+        ).values(version=5, updated_at=datetime.utcnow()))
+    http_cache.bump(user_id, 'glucose')
+    db.session.commit()
+
+    assert http_cache.bumped_version(user_id, 'glucose') == 6
+    assert http_cache.current_versions(user_id, ['glucose'])['glucose'][0] == 6
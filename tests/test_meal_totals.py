@@ -0,0 +1,37 @@
+from sqlalchemy import update
+from app.models import db, Meal
+from app.services import meal_totals
+
+
+def check(app):
+    return app.test_cli_runner().invoke(args=['check-meal-totals'])
+
+
+def test_stored_totals_match_items_after_updates(app, client, auth_headers, food, recipe):
+    items = [{'food_id': food['id'], 'amount': 150}, {'recipe_id': recipe['id'], 'quantity': 2}]
+    client.post('/api/meals', json={'name': 'Lunch', 'timestamp': '2026-01-01T12:00:00', 'items': items}, headers=auth_headers)
+    client.post('/api/meals/batch', json={'meals': [
+        {'name': f'Dinner {i}', 'timestamp': f'2026-01-0{i + 1}T19:00:00', 'items': items} for i in range(3)
+    ]}, headers=auth_headers)
+
+    client.put(f"/api/foods/{food['id']}", json={'calories': 80, 'carbs': 20}, headers=auth_headers)
+    client.put(f"/api/recipes/{recipe['id']}", json={'calories': 450, 'servings': 2}, headers=auth_headers)
+
+    meal_ids = [meal_id for (meal_id,) in db.session.query(Meal.id)]
+    assert len(meal_ids) == 4
+    assert meal_totals.recompute(meal_ids) == set()
+    result = check(app)
+    assert result.exit_code == 0
+    assert '0 meals with stale totals' in result.output
+
+
+def test_check_reports_stale_totals(app, client, auth_headers, food):
+    meal = client.post('/api/meals', json={
+        'name': 'Lunch', 'timestamp': '2026-01-01T12:00:00', 'items': [{'food_id': food['id'], 'amount': 100}]
+    }, headers=auth_headers).get_json()
+    db.session.execute(update(Meal).where(Meal.id == meal['id']).values(calories=1))
+    db.session.commit()
+
+    result = check(app)
+    assert result.exit_code == 1
+    assert '1 meals with stale totals' in result.output
@@ -0,0 +1,20 @@
+def test_recreated_food_with_reused_id_gets_its_own_totals(client, auth_headers):
+    def create_food(name, calories):
+        return client.post('/api/foods', json={
+            'name': name, 'calories': calories, 'carbs': 0, 'protein': 0, 'fat': 0
+        }, headers=auth_headers).get_json()
+
+    def log(food):
+        return client.post('/api/meals', json={
+            'name': 'Snack', 'timestamp': '2026-01-01T10:00:00', 'items': [{'food_id': food['id'], 'amount': 100}]
+        }, headers=auth_headers).get_json()
+
+    apple = create_food('Apple', 52)
+    client.delete(f"/api/meals/{log(apple)['id']}", headers=auth_headers)
+    client.delete(f"/api/foods/{apple['id']}", headers=auth_headers)
+
+    # SQLite hands the freed id out again, and the new food starts at version 1
+    butter = create_food('Butter', 717)
+    assert butter['id'] == apple['id']
+
+    assert log(butter)['total_calories'] == 717
@@ -0,0 +1,41 @@
+import pytest
+from sqlalchemy import event
+from app.models import db
+
+
+def count_statements(client, path, headers):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        response = client.get(path, headers=headers)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    assert response.status_code == 200
+    return len(statements)
+
+
+def log_meals(client, headers, food, recipe, count, start):
+    meals = [{
+        'name': f'Lunch {start + i}',
+        'timestamp': f'2026-01-{1 + (start + i) % 28:02d}T12:{(start + i) % 60:02d}:00',
+        'items': [{'food_id': food['id'], 'amount': 150}, {'recipe_id': recipe['id'], 'quantity': 1}]
+    } for i in range(count)]
+    response = client.post('/api/meals/batch', json={'meals': meals}, headers=headers)
+    assert response.status_code == 201
+
+
+@pytest.mark.parametrize('path', ['/api/meals', '/api/search?q=lunch&limit=50'])
+def test_query_count_does_not_grow_with_meals(client, auth_headers, food, recipe, path):
+    log_meals(client, auth_headers, food, recipe, 1, 0)
+    client.get(path, headers=auth_headers)  # builds the per-process search index
+    with_one = count_statements(client, path, auth_headers)
+
+    log_meals(client, auth_headers, food, recipe, 49, 1)
+    client.get(path, headers=auth_headers)
+    with_fifty = count_statements(client, path, auth_headers)
+
+    assert with_fifty == with_one
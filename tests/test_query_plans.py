@@ -0,0 +1,5 @@
+from app.services import query_plans
+
+
+def test_hot_queries_use_indexes(app):
+    assert query_plans.check() == {}
@@ -0,0 +1,55 @@
+import pytest
+
+
+@pytest.fixture
+def nested(client, auth_headers):
+    """Porridge (200 g of oats) used twice by Breakfast bowl; returns (food, inner, outer)."""
+    oats = client.post('/api/foods', json={
+        'name': 'Oats', 'calories': 380, 'carbs': 66, 'protein': 13, 'fat': 7
+    }, headers=auth_headers).get_json()
+    inner = client.post('/api/recipes', json={
+        'name': 'Porridge', 'ingredients': 'oats', 'items': [{'food_id': oats['id'], 'amount': 200}]
+    }, headers=auth_headers).get_json()
+    outer = client.post('/api/recipes', json={
+        'name': 'Breakfast bowl', 'ingredients': 'porridge', 'items': [{'recipe_id': inner['id'], 'quantity': 2}]
+    }, headers=auth_headers).get_json()
+    return oats, inner, outer
+
+
+def get_recipe(client, headers, recipe_id):
+    return client.get(f'/api/recipes/{recipe_id}', headers=headers).get_json()
+
+
+def test_cycle_is_rejected(client, auth_headers, nested):
+    _, inner, outer = nested
+
+    response = client.put(f"/api/recipes/{inner['id']}", json={'items': [{'recipe_id': outer['id']}]}, headers=auth_headers)
+    assert response.status_code == 400
+
+    response = client.put(f"/api/recipes/{inner['id']}", json={'items': [{'recipe_id': inner['id']}]}, headers=auth_headers)
+    assert response.status_code == 400
+    assert get_recipe(client, auth_headers, inner['id'])['items'][0]['food_id'] is not None
+
+
+def test_nested_recipe_follows_food_update(client, auth_headers, nested):
+    oats, inner, outer = nested
+    assert inner['calories'] > 0
+    assert outer['calories'] == pytest.approx(2 * inner['calories'])
+
+    client.put(f"/api/foods/{oats['id']}", json={'calories': 760}, headers=auth_headers)
+
+    assert get_recipe(client, auth_headers, inner['id'])['calories'] == pytest.approx(2 * inner['calories'])
+    assert get_recipe(client, auth_headers, outer['id'])['calories'] == pytest.approx(2 * outer['calories'])
+
+
+def test_meals_using_the_recipe_are_recomputed(client, auth_headers, nested):
+    oats, _, outer = nested
+    meal = client.post('/api/meals', json={
+        'name': 'Breakfast', 'timestamp': '2026-01-01T08:00:00', 'items': [{'recipe_id': outer['id'], 'quantity': 1}]
+    }, headers=auth_headers).get_json()
+    assert meal['total_calories'] == pytest.approx(outer['calories'])
+
+    client.put(f"/api/foods/{oats['id']}", json={'calories': 760}, headers=auth_headers)
+
+    meals = client.get('/api/meals', headers=auth_headers).get_json()
+    assert meals[0]['total_calories'] == pytest.approx(2 * outer['calories'])
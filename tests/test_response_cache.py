@@ -0,0 +1,27 @@
+import pytest
+from app.services import response_cache
+
+
+def daily_calories(client, headers):
+    response = client.get('/api/analytics/daily?date=2026-01-01', headers=headers)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+@pytest.mark.parametrize('backend, url, reaches_worker', [
+    ('memory', None, False),  # the write lands in another worker, this one's invalidate() never runs
+    ('redis', 'fake://', True)
+])
+def test_cached_analytics_change_after_meal_write(app, client, auth_headers, food, monkeypatch, backend, url, reaches_worker):
+    app.config.update(ANALYTICS_CACHE_BACKEND=backend, ANALYTICS_CACHE_URL=url)
+    meal = {'name': 'Breakfast', 'timestamp': '2026-01-01T08:00:00', 'items': [{'food_id': food['id'], 'amount': 100}]}
+    client.post('/api/meals', json=meal, headers=auth_headers)
+    before = daily_calories(client, auth_headers)
+    assert daily_calories(client, auth_headers) == before
+    assert response_cache.backend().keys_for(food['user_id'])
+
+    if not reaches_worker:
+        monkeypatch.setattr(response_cache, 'invalidate', lambda user_id, *days: None)
+    client.post('/api/meals', json=dict(meal, timestamp='2026-01-01T12:00:00'), headers=auth_headers)
+
+    assert daily_calories(client, auth_headers) != before
@@ -0,0 +1,30 @@
+from app.models import db, Food
+from app.services import http_cache, search
+
+
+def names(client, headers, query):
+    return [item['name'] for item in client.get(f'/api/search?q={query}', headers=headers).get_json()['foods']]
+
+
+def test_write_in_another_worker_rebuilds_index(client, auth_headers, food):
+    assert names(client, auth_headers, 'banana') == []
+
+    # What another worker's create_food leaves behind: the row and the version
+    # bump, but no patch of this process's index
+    user_id = food['user_id']
+    db.session.add(Food(name='Banana', calories=89, carbs=23, proteins=1.1, fats=0.3, user_id=user_id))
+    http_cache.bump(user_id, 'foods')
+    db.session.commit()
+    db.session.remove()
+
+    assert names(client, auth_headers, 'banana') == ['Banana']
+
+
+def test_own_write_patches_index(client, auth_headers, food):
+    assert names(client, auth_headers, 'apple') == ['Apple']
+    index = search._indexes[(str(food['user_id']), 'foods')]
+
+    client.put(f"/api/foods/{food['id']}", json={'name': 'Green apple'}, headers=auth_headers)
+
+    assert names(client, auth_headers, 'apple') == ['Green apple']
+    assert search._indexes[(str(food['user_id']), 'foods')] is index
@@ -0,0 +1,20 @@
+from sqlalchemy import inspect
+from app import create_app
+from app.models import db
+from app.services import startup
+
+
+def test_preflight_migrates_an_empty_database_to_head(tmp_path):
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'preflight.db'}"})
+    with app.app_context():
+        timings = dict((name, detail) for name, _, detail in startup.preflight())
+        head = startup._revision(db)
+
+        assert head is not None
+        assert timings['migrate'] == f'empty -> {head}'
+        columns = {column['name'] for column in inspect(db.engine).get_columns('meals')}
+        assert 'calories' in columns
+
+        again = dict((name, detail) for name, _, detail in startup.preflight())
+        assert again['migrate'] == f'at {head}'
+        db.engine.dispose()